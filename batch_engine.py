@@ -0,0 +1,172 @@
+import numpy as np
+
+from classes import Match, HOME
+
+BLOCK_SIZE = 1 << 15  # Matches handled together by the event-driven engine, bounding its temporary arrays
+ENGINE_VERSION = 1  # Bump whenever a change alters simulated results; cached results are keyed on it
+OUTCOMES = ("Home Team Wins!", "Away Team Wins!", "It's a Draw!")
+
+
+class BatchResult:
+    def __init__(self, home_goals, away_goals, home_possession=None):
+        self.home_goals = home_goals  # One entry per simulated match
+        self.away_goals = away_goals
+        self.home_possession = home_possession  # Minutes the home team started with the ball
+
+    def __len__(self):
+        return len(self.home_goals)
+
+    def outcome_counts(self):
+        """
+        Returns how often each outcome_phase string occurred, in the same wording Match uses.
+        """
+        home_wins = int(np.count_nonzero(self.home_goals > self.away_goals))
+        away_wins = int(np.count_nonzero(self.home_goals < self.away_goals))
+        return {
+            OUTCOMES[0]: home_wins,
+            OUTCOMES[1]: away_wins,
+            OUTCOMES[2]: len(self) - home_wins - away_wins,
+        }
+
+
+class BatchMatchEngine:
+    def __init__(self, match, seed=None):
+        """
+        Prepares a vectorized engine from a Match template.
+        The template's setup phase is run once and the per-player pass and shot probabilities
+        are frozen into lookup tables indexed by (team in possession, active player).
+        """
+        self.match = match
+        self.rng = np.random.default_rng(seed)
+        match.setup_phase()
+
+        teams = (match.home_team, match.away_team)
+        rosters = [team.get_active_players() for team in teams]
+        for team, roster in zip(teams, rosters):
+            if not roster:
+                raise ValueError(f"Team {team} has no active players")
+
+        width = max(len(roster) for roster in rosters)
+        self.active_counts = np.array([len(roster) for roster in rosters], dtype=np.intp)
+        self.pass_table = np.zeros((2, width))
+        self.shot_table = np.zeros((2, width))
+        for side, roster in enumerate(rosters):
+            for index, player in enumerate(roster):
+                self.pass_table[side, index] = match.pass_probability(player)
+                self.shot_table[side, index] = match.shot_probability(player)
+
+    def simulate(self, n, minutes=None):
+        """
+        Simulates n matches at once, advancing every match by one minute per step.
+        Mirrors Match.simulation_phase: the player in possession passes, a failed pass hands the
+        ball over, and the shot (if it goes in) counts for the team that started the minute with the ball.
+        """
+        rng = self.rng
+        possession = rng.integers(0, 2, size=n, dtype=np.int8)
+        home_goals = np.zeros(n, dtype=np.int32)
+        away_goals = np.zeros(n, dtype=np.int32)
+        home_possession = np.zeros(n, dtype=np.int32)
+        active_player = np.zeros(n, dtype=np.intp)
+
+        for minute in range(minutes or Match.MATCH_TIME):
+            draws = rng.random((3, n))
+            np.multiply(draws[0], self.active_counts[possession], out=draws[0])
+            active_player[:] = draws[0]
+
+            passed = draws[1] < self.pass_table[possession, active_player]
+            scored = draws[2] < self.shot_table[possession, active_player]
+
+            home_attack = possession == HOME
+            home_goals += scored & home_attack
+            away_goals += scored & ~home_attack
+            home_possession += home_attack
+            possession ^= ~passed
+
+        return BatchResult(home_goals, away_goals, home_possession)
+
+
+class EventDrivenEngine(BatchMatchEngine):
+    def __init__(self, match, seed=None):
+        """
+        Batch engine that jumps from one possession change to the next instead of ticking every minute.
+        A possession spell lasts a geometric number of minutes, and whether a minute yields a goal only depends on
+        whether the ball was kept or lost in it. So the loop just counts kept and lost minutes per side, and the
+        goals are drawn at the end as binomials with the matching conditional chances. All chances come from the
+        same per-player tables as the tick engine, so score and possession distributions are identical.
+        """
+        super().__init__(match, seed=seed)
+        tiny = np.finfo(float).tiny
+        self.lose_chance = np.zeros(2)
+        self.keep_goal_chance = np.zeros(2)
+        self.lose_goal_chance = np.zeros(2)
+        for side, count in enumerate(self.active_counts):
+            # Each minute draws a uniform active player, so mix the per-player chances evenly
+            passes = self.pass_table[side, :count]
+            shots = self.shot_table[side, :count]
+            self.lose_chance[side] = np.mean(1 - passes)
+            self.keep_goal_chance[side] = np.mean(shots * passes) / max(np.mean(passes), tiny)
+            self.lose_goal_chance[side] = np.mean(shots * (1 - passes)) / max(self.lose_chance[side], tiny)
+
+    def _spell_width(self, minutes):
+        """
+        Spells drawn per match in one vectorized round: a little above the expected count, so almost every
+        match finishes in the first round and the rest need only one or two more.
+        """
+        expected = minutes * float(np.mean(self.lose_chance)) + 1
+        return int(min(minutes + 1, expected * 1.25 + 8))
+
+    def simulate(self, n, minutes=None):
+        """
+        Simulates n matches by drawing whole sequences of possession spells at once.
+        Every completed spell ends in a turnover, so sides simply alternate along the sequence:
+        even spells belong to the side that kicked off the round, odd ones to the other.
+        """
+        rng = self.rng
+        minutes = minutes or Match.MATCH_TIME
+        width = self._spell_width(minutes)
+        kept = np.zeros((2, n), dtype=np.int32)  # Minutes per side in which the ball was kept
+        lost = np.zeros((2, n), dtype=np.int32)  # Minutes per side in which the ball was lost
+        possession = rng.integers(0, 2, size=n, dtype=np.int8)
+        clock = np.zeros(n, dtype=np.int32)
+
+        # Geometric spell lengths by inversion, floor(log(1 - u) / log(1 - lose)) + 1. A side that never loses
+        # the ball gets -inf here, which turns into an endless spell; one that always loses it gets -0.0, i.e. 1.
+        with np.errstate(divide="ignore"):
+            scale = np.where(self.lose_chance > 0, 1 / np.log1p(-self.lose_chance), -np.inf)
+        same_scale = scale[0] == scale[1]
+        parity = np.arange(width, dtype=np.int8) & 1
+
+        for block in range(0, n, BLOCK_SIZE):
+            running = np.arange(block, min(block + BLOCK_SIZE, n))
+            while len(running):
+                first = possession[running]
+                with np.errstate(invalid="ignore"):
+                    spell = np.log1p(-rng.random((len(running), width)))
+                    spell *= scale[0] if same_scale else scale[first[:, None] ^ parity]
+                # nan (u == 0 for a side that never loses the ball) and inf both mean the spell outlasts the match
+                spell = np.fmin(np.floor(spell) + 1, minutes + 1).astype(np.int32)
+
+                end = np.cumsum(spell, axis=1)
+                end += clock[running, None]
+                complete = end <= minutes
+                completed = complete.sum(axis=1)
+                spell[~complete] = 0
+                even = spell[:, 0::2].sum(axis=1)
+                odd = spell[:, 1::2].sum(axis=1)
+                kept[first, running] += even - (completed + 1) // 2
+                kept[first ^ 1, running] += odd - completed // 2
+                lost[first, running] += (completed + 1) // 2
+                lost[first ^ 1, running] += completed // 2
+
+                # The first spell cut off by the final whistle runs out the clock without a turnover
+                finished = completed < width
+                rows = running[finished]
+                last_side = first[finished] ^ (completed[finished] & 1)
+                kept[last_side, rows] += minutes - clock[rows] - even[finished] - odd[finished]
+
+                running = running[~finished]
+                clock[running] = end[~finished, -1]
+                possession[running] ^= width & 1
+
+        goals = rng.binomial(kept, self.keep_goal_chance[:, None]) + rng.binomial(lost, self.lose_goal_chance[:, None])
+        return BatchResult(goals[HOME].astype(np.int32), goals[1 - HOME].astype(np.int32), kept[HOME] + lost[HOME])
@@ -1,5 +1,30 @@
 import random
+from array import array
+from collections import namedtuple
+from collections.abc import Sequence
+from enum import IntEnum
+from columns import Column
 from mocks import MockDataSource
+from roster_store import RosterStore, StatColumn, STAT_FIELDS
+
+HOME = 0
+AWAY = 1
+SIDE_NAMES = ("Home", "Away")
+# Offsets within a StatsPlayer's row of the counters Match.simulation_phase credits
+RED_CARD, GOALS, ASSISTS, SHOTS_ON, SHOTS_OFF, PLUS, PASSES, TURNOVERS = (
+    STAT_FIELDS.index(name)
+    for name in ("red_card", "goals", "assists", "shots_on", "shots_off", "plus", "passes", "turnovers"))
+
+
+class EventKind(IntEnum):
+    PASS = 0
+    INTERCEPTION = 1
+    GOAL = 2
+    INJURY = 3
+    RED_CARD = 4
+
+
+MatchEvent = namedtuple("MatchEvent", ["minute", "kind", "team", "player"])
 
 
 class Tactics:
@@ -21,6 +46,18 @@ class Tactics:
         for attr, multiplier in effects.items():
             setattr(player, attr, getattr(player, attr) * multiplier)
 
+    @staticmethod
+    def effective_multipliers(tactic_name, home_advantage=1.0):
+        """
+        Returns the combined multiplier per rating attribute for a tactic and venue, without touching any player.
+        Effects on attributes a Player does not carry (e.g. speed) are ignored.
+        """
+        multipliers = {attr: home_advantage for attr in RatingTable.ATTRIBUTES}
+        for attr, multiplier in Tactics.TACTIC_EFFECTS.get(tactic_name, {}).items():
+            if attr in multipliers:
+                multipliers[attr] *= multiplier
+        return multipliers
+
     @staticmethod
     def get_tactic_behaviors(tactic_name):
         """
@@ -33,41 +70,101 @@ class Tactics:
             return ["standard_play"]
 
 
+def _unpickle_view(make, store, row):
+    # The store was unpickled first and renumbered its rows on the way
+    return make(store, store.moved[row])
+
+
 class StatsPlayer:
-    def __init__(self):
-        self.yellow_card = 0
-        self.red_card = 0
-        self.goals = 0
-        self.assists = 0
-        self.shots_on = 0
-        self.shots_off = 0
-        self.fouls = 0
-        self.plus = 0
+    __slots__ = ("_store", "_row", "__weakref__")
+
+    yellow_card = StatColumn(0)
+    red_card = StatColumn(1)
+    goals = StatColumn(2)
+    assists = StatColumn(3)
+    shots_on = StatColumn(4)
+    shots_off = StatColumn(5)
+    fouls = StatColumn(6)
+    plus = StatColumn(7)
+    passes = StatColumn(8)
+    turnovers = StatColumn(9)  # Possession lost on a failed pass
+
+    def __init__(self, store=None, row=None):
+        """
+        Counters of one player, stored as a row of a RosterStore's stats block.
+        """
+        self._store = store if store is not None else RosterStore.default()
+        self._row = self._store.allocate() if row is None else row
+        self._store.register(self)
+
+    def __reduce__(self):
+        return _unpickle_view, (StatsPlayer, self._store, self._row)
+
+    def as_dict(self):
+        return dict(zip(STAT_FIELDS, self._store.stats[self._row].tolist()))
 
     def __str__(self):
-        return str(self.__dict__)
+        return str(self.as_dict())
 
 
 class Player:
-    def __init__(self, player):
-        self.name = player.name
-        self.experience = player.experience
-        self.powerInGoal = player.powerInGoal
-        self.powerInDefense = player.powerInDefense
-        self.powerInMidfield = player.powerInMidfield
-        self.powerInOffense = player.powerInAttack
-        self.powerInAccuracy = player.powerInAccuracy
-        self.energy = player.actualEnergy
-        self.positionId = player.positionId
-        self.id = player.id
-        self.injured = False
-        if not player.banned:
-            self.banned = 0
-        else:
-            self.banned = player.banned
-        self.stats = StatsPlayer()
-        self.injury_chance = 0.01  # Chance of getting injured during a play
+    __slots__ = ("_store", "_rows", "_row", "stats", "__weakref__")
+
+    experience = Column()
+    powerInGoal = Column()
+    powerInDefense = Column()
+    powerInMidfield = Column()
+    powerInOffense = Column()
+    powerInAccuracy = Column()
+    energy = Column()
+    positionId = Column()
+    id = Column()
+    injured = Column()
+    banned = Column()
+    injury_chance = Column()  # Chance of getting injured during a play
+
+    def __init__(self, player, store=None):
+        """
+        Copies a data source row into a RosterStore and becomes a view over it.
+        Players created without a store share RosterStore.default().
+        """
+        self._store = store if store is not None else RosterStore.default()
+        self._rows = self._store.column_rows
+        self._row = self._store.add(player)
+        self.stats = StatsPlayer(self._store, self._row)
+        self._store.register(self)
+
+    @classmethod
+    def from_row(cls, store, row):
+        """
+        Returns a Player viewing a row that is already in store, e.g. one filled by RosterStore.add_many.
+        """
+        player = cls.__new__(cls)
+        player._store = store
+        player._rows = store.column_rows
+        player._row = row
+        player.stats = StatsPlayer(store, row)
+        store.register(player)
+        return player
 
+    def __reduce__(self):
+        return _unpickle_view, (Player.from_row, self._store, self._row)
+
+    @property
+    def store(self):
+        return self._store
+
+    @property
+    def row(self):
+        return self._row
+
+    @property
+    def name(self):
+        return self._store.names[self._row]
+
+    @name.setter
+    def name(self, name):
+        self._store.names[self._row] = name
 
     def get_injured(self):
         """Method to potentially injure a player based on their injury chance."""
@@ -78,95 +175,342 @@ class Player:
         return self.name
 
 
+class RatingTable:
+    ATTRIBUTES = ("powerInGoal", "powerInDefense", "powerInMidfield", "powerInOffense", "powerInAccuracy")
+
+    def __init__(self, players, multipliers):
+        """
+        Effective ratings of a roster under fixed multipliers, stored column-wise in roster order.
+        """
+        self.columns = {attr: tuple(getattr(player, attr) * multipliers[attr] for player in players)
+                        for attr in RatingTable.ATTRIBUTES}
+
+    def rating(self, index, attr):
+        return self.columns[attr][index]
+
+    def for_player(self, index):
+        return {attr: column[index] for attr, column in self.columns.items()}
+
+
 class Team:
     def __init__(self, players, tactics=None):
         """
         Initialize a team with a list of players and optional tactics.
         """
+        self.roster_version = 0
+        self._rating_tables = {}
         self.players = players  # List of Player objects
         self.tactics = tactics or {}  # Placeholder for tactics/strategy data (e.g., formation, style of play)
 
-    def get_active_players(self):
+    @property
+    def players(self):
+        return self._players
+
+    @players.setter
+    def players(self, players):
+        self._players = players
+        self.roster_changed()
+
+    def roster_changed(self):
+        """
+        Marks cached effective ratings as stale. Call after editing the player list in place
+        or changing a player's base ratings.
+        """
+        self.roster_version += 1
+        self._rating_tables.clear()
+        self._roster_positions = {player: index for index, player in enumerate(self.players)}
+        self.reset_active_players()
+
+    def roster_position(self, player):
+        """
+        Returns the index of a player in self.players.
+        """
+        return self._roster_positions[player]
+
+    def reset_active_players(self):
         """
-        Returns a list of players who are not injured and not banned.
+        Rebuilds the active-player index from the players' injured and banned flags.
+        Match.setup_phase calls this once, so dismissals from a previous match do not carry over.
+        """
+        self._active = self.starters()
+        self._active_slots = {player: slot for slot, player in enumerate(self._active)}
+
+    def starters(self):
+        """
+        Returns a new list of the players who would start a match now, in roster order, without touching the
+        active index of a match in progress.
         """
         return [player for player in self.players if not player.injured and not player.banned]
 
+    def remove_from_play(self, player):
+        """
+        Takes an injured or sent-off player out of the active index in O(1).
+        """
+        slot = self._active_slots.pop(player)
+        last = self._active.pop()
+        if last is not player:
+            self._active[slot] = last
+            self._active_slots[last] = slot
+
+    def effective_ratings(self, tactic_name="normal", home_advantage=1.0):
+        """
+        Returns the RatingTable for a tactic and venue, computing it once per roster version.
+        """
+        multipliers = Tactics.effective_multipliers(tactic_name, home_advantage)
+        key = (tactic_name, tuple(multipliers.values()))
+        table = self._rating_tables.get(key)
+        if table is None:
+            table = self._rating_tables[key] = RatingTable(self.players, multipliers)
+        return table
+
+    def get_active_players(self):
+        """
+        Returns the players currently on the pitch: not injured, not banned and not dismissed during the match.
+        The list is the live index itself, so callers must not modify it.
+        """
+        return self._active
+
     def __str__(self):
         return ", ".join([player.name for player in self.players])
 
 
+class EventLog:
+    def __init__(self):
+        """
+        Compact store of match events. Each event is a minute, an EventKind, the side (HOME/AWAY)
+        and the index of the acting player in that side's roster, packed into one integer so that
+        recording an event is a single array append.
+        """
+        self.codes = array("Q")
+
+    def append(self, minute, kind, team, player):
+        self.codes.append(minute << 32 | kind << 24 | team << 16 | player)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        code = self.codes[index]
+        return MatchEvent(code >> 32, EventKind(code >> 24 & 0xFF), code >> 16 & 0xFF, code & 0xFFFF)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
+class Commentary(Sequence):
+    def __init__(self, match):
+        """
+        Read-only view that renders a match's event log into English lines on first access, and again only
+        once more events or the outcome have been recorded since.
+        """
+        self.match = match
+        self._lines = None
+        self._rendered = None  # (events, outcome) the lines were rendered from
+
+    def _render(self):
+        match = self.match
+        rosters = (match.home_team.players, match.away_team.players)
+        score = [0, 0]
+        lines = []
+        for event in match.events or ():
+            name = rosters[event.team][event.player].name
+            side = SIDE_NAMES[event.team]
+            if event.kind == EventKind.PASS:
+                lines.append(f"Minute {event.minute}: {name} from the {side} team successfully passes the ball.")
+            elif event.kind == EventKind.INTERCEPTION:
+                lines.append(f"Minute {event.minute}: {name}'s pass is intercepted by the "
+                             f"{SIDE_NAMES[1 - event.team]} team!")
+            elif event.kind == EventKind.INJURY:
+                lines.append(f"Minute {event.minute}: {name} from the {side} team is injured and leaves the pitch.")
+            elif event.kind == EventKind.RED_CARD:
+                lines.append(f"Minute {event.minute}: RED CARD! {name} from the {side} team is sent off!")
+            else:
+                score[event.team] += 1
+                lines.append(f"Minute {event.minute}: GOAL! {name} from the {side} team scores! "
+                             f"Current score: {score[HOME]}-{score[AWAY]}")
+        if match.outcome is not None:
+            lines.append(match.outcome)
+        return lines
+
+    @property
+    def lines(self):
+        state = (len(self.match.events or ()), self.match.outcome)
+        if state != self._rendered:
+            self._lines = self._render()
+            self._rendered = state
+        return self._lines
+
+    def __getitem__(self, index):
+        return self.lines[index]
+
+    def __len__(self):
+        return len(self.lines)
+
+
 class Match:
     HOME_ADVANTAGE = 1.05
     MATCH_TIME = 90
+    PASS_BONUS = 0.2
+    PASS_THRESHOLD = 0.5
+    SHOT_BONUS = 0.1
+    SHOT_THRESHOLD = 0.8
+    RED_CARD_CHANCE = 0.003  # Chance per minute that a defender is sent off
 
-    def __init__(self, home_team, away_team, home_tactic="normal", away_tactic="normal"):
+    def __init__(self, home_team, away_team, home_tactic="normal", away_tactic="normal", record_events=True,
+                 rng=None, record_stats=True):
+        self.rng = rng if rng is not None else random  # Anything with random() and choice(), e.g. random.Random(seed)
         self.home_team = home_team
         self.away_team = away_team
         self.home_tactic = home_tactic
         self.away_tactic = away_tactic
         self.home_goals = 0
         self.away_goals = 0
-        self.ball_possession = random.choice([self.home_team, self.away_team])
-        self.commentary = []
-
-    def apply_home_advantage(self):
-        for player in self.home_team.players:
-            player.powerInGoal *= Match.HOME_ADVANTAGE
-            player.powerInDefense *= Match.HOME_ADVANTAGE
-            player.powerInMidfield *= Match.HOME_ADVANTAGE
-            player.powerInOffense *= Match.HOME_ADVANTAGE
-            player.powerInAccuracy *= Match.HOME_ADVANTAGE
-
-    def apply_tactics(self):
-        for player in self.home_team.players:
-            Tactics.apply_tactic(player, self.home_tactic)
-        for player in self.away_team.players:
-            Tactics.apply_tactic(player, self.away_tactic)
+        self.ball_possession = self.rng.choice([self.home_team, self.away_team])
+        self.events = EventLog() if record_events else None  # None skips event recording entirely
+        self.record_stats = record_stats  # Credit goals, shots, passes, cards and plus/minus to each StatsPlayer
+        self.outcome = None
+        self.home_ratings = None  # RatingTable per side, filled in by setup_phase
+        self.away_ratings = None
+        self._commentary = None
+
+    @property
+    def commentary(self):
+        """
+        Commentary lines rendered lazily from the event log, followed by the outcome once known.
+        """
+        if self._commentary is None:
+            self._commentary = Commentary(self)
+        return self._commentary
 
     def setup_phase(self):
-        self.apply_home_advantage()
-        self.apply_tactics()
+        """
+        Looks up the effective ratings of both sides. Base player attributes are never modified,
+        so the same rosters can be reused by any number of matches.
+        """
+        self.home_ratings = self.home_team.effective_ratings(self.home_tactic, Match.HOME_ADVANTAGE)
+        self.away_ratings = self.away_team.effective_ratings(self.away_tactic)
+        self.home_team.reset_active_players()
+        self.away_team.reset_active_players()
 
     def pass_ball(self, player):
-        success_chance = random.random() + 0.2
-        return success_chance > 0.5
+        success_chance = self.rng.random() + Match.PASS_BONUS
+        return success_chance > Match.PASS_THRESHOLD
 
     def shoot(self, player):
-        success_chance = random.random() + 0.1
-        return success_chance > 0.8
+        success_chance = self.rng.random() + Match.SHOT_BONUS
+        return success_chance > Match.SHOT_THRESHOLD
+
+    def pass_probability(self, player):
+        """
+        Probability that pass_ball succeeds for the given player.
+        """
+        return min(1.0, max(0.0, 1 - (Match.PASS_THRESHOLD - Match.PASS_BONUS)))
+
+    def shot_probability(self, player):
+        """
+        Probability that shoot scores for the given player.
+        """
+        return min(1.0, max(0.0, 1 - (Match.SHOT_THRESHOLD - Match.SHOT_BONUS)))
 
     def simulation_phase(self):
+        events = self.events
+        record = events.append if events is not None else None
+        # Plain ints: looking up and packing EventKind members costs as much as the rest of recording an event
+        passed, intercepted, goal, injury, red_card = map(int, EventKind)
+        # Bound once: the loop below runs every minute of every simulated match
+        rng_random, rng_choice = self.rng.random, self.rng.choice
+        pass_ball, shoot = self.pass_ball, self.shoot
+        home_team, away_team = self.home_team, self.away_team
+        red_card_chance = Match.RED_CARD_CHANCE
+        # Player -> (RosterStore, start of their flat stats row). Plays are counted straight into the rows, and
+        # plus/minus is added after the final whistle
+        stat_slots = None
+        if self.record_stats:
+            starters = (list(home_team.get_active_players()), list(away_team.get_active_players()))
+            width = len(STAT_FIELDS)
+            stat_slots = {player: (player._store, player._row * width) for players in starters for player in players}
+            margin_when_leaving = {}  # Player taken off -> home goals minus away goals at that moment
+            last_passer = None  # Player whose pass kept the ball in the previous minute
         for minute in range(Match.MATCH_TIME):
             # Selecting a random player from the team in possession for the action
-            active_player = random.choice(self.ball_possession.get_active_players())
+            attacking_team = self.ball_possession
+            attackers = attacking_team.get_active_players()
+            active_player = rng_choice(attackers)
+            if attacking_team is home_team:
+                side, defending_team = HOME, away_team
+            else:
+                side, defending_team = AWAY, home_team
+            if record is not None:
+                player_index = attacking_team.roster_position(active_player)
 
-            if self.ball_possession == self.home_team:
-                if self.pass_ball(active_player):
-                    self.commentary.append(
-                        f"Minute {minute}: {active_player.name} from the Home team successfully passes the ball.")
-                else:
-                    self.commentary.append(
-                        f"Minute {minute}: {active_player.name}'s pass is intercepted by the Away team!")
-                    self.ball_possession = self.away_team
+            kept = pass_ball(active_player)
+            if kept:
+                if record is not None:
+                    record(minute, passed, side, player_index)
+            else:
+                if record is not None:
+                    record(minute, intercepted, side, player_index)
+                self.ball_possession = defending_team
 
-                if self.shoot(active_player):
+            scored = shoot(active_player)
+            if scored:
+                if side == HOME:
                     self.home_goals += 1
-                    self.commentary.append(
-                        f"Minute {minute}: GOAL! {active_player.name} from the Home team scores! Current score: {self.home_goals}-{self.away_goals}")
-            else:
-                if self.pass_ball(active_player):
-                    self.commentary.append(
-                        f"Minute {minute}: {active_player.name} from the Away team successfully passes the ball.")
                 else:
-                    self.commentary.append(
-                        f"Minute {minute}: {active_player.name}'s pass is intercepted by the Home team!")
-                    self.ball_possession = self.home_team
-
-                if self.shoot(active_player):
                     self.away_goals += 1
-                    self.commentary.append(
-                        f"Minute {minute}: GOAL! {active_player.name} from the Away team scores! Current score: {self.home_goals}-{self.away_goals}")
+                if record is not None:
+                    record(minute, goal, side, player_index)
+
+            if stat_slots is not None:
+                # Every play is a pass kept or a turnover, and a goal (also a shot on target) or a shot off target
+                store, base = stat_slots[active_player]
+                counters = store.stat_rows
+                counters[base + (PASSES if kept else TURNOVERS)] += 1
+                if scored:
+                    counters[base + GOALS] += 1
+                    counters[base + SHOTS_ON] += 1
+                    if last_passer is not None and last_passer is not active_player:
+                        store, base = stat_slots[last_passer]
+                        store.stat_rows[base + ASSISTS] += 1
+                else:
+                    counters[base + SHOTS_OFF] += 1
+                last_passer = active_player if kept else None
+
+            # The last player on the pitch is never taken off, so every minute still has someone to act
+            if rng_random() < active_player.injury_chance and len(attackers) > 1:
+                attacking_team.remove_from_play(active_player)
+                if record is not None:
+                    record(minute, injury, side, player_index)
+                if stat_slots is not None:
+                    margin_when_leaving[active_player] = self.home_goals - self.away_goals
+                    if last_passer is active_player:
+                        last_passer = None
+
+            if rng_random() < red_card_chance and len(defending_team.get_active_players()) > 1:
+                offender = rng_choice(defending_team.get_active_players())
+                defending_team.remove_from_play(offender)
+                if record is not None:
+                    record(minute, red_card, 1 - side, defending_team.roster_position(offender))
+                if stat_slots is not None:
+                    margin_when_leaving[offender] = self.home_goals - self.away_goals
+                    store, base = stat_slots[offender]
+                    store.stat_rows[base + RED_CARD] += 1
+
+        if stat_slots is not None:
+            self._credit_plus_minus(stat_slots, starters, margin_when_leaving)
+
+    def _credit_plus_minus(self, stat_slots, starters, margin_when_leaving):
+        """
+        Adds to each starter's plus counter the goal margin from their side while they were on the pitch.
+        A team playing itself credits each player once, from the away side.
+        """
+        final_margin = self.home_goals - self.away_goals
+        plus = {player: sign * margin_when_leaving.get(player, final_margin)
+                for sign, players in zip((1, -1), starters) for player in players}
+        for player, margin in plus.items():
+            store, base = stat_slots[player]
+            store.stat_rows[base + PLUS] += margin
 
     def outcome_phase(self):
         if self.home_goals > self.away_goals:
@@ -179,9 +523,18 @@ class Match:
     def simulate_match(self):
         self.setup_phase()
         self.simulation_phase()
-        outcome = self.outcome_phase()
-        self.commentary.append(outcome)
+        self.outcome = self.outcome_phase()
         return self.commentary
+
+    def simulate_batch(self, n, seed=None, event_driven=False):
+        """
+        Simulates n independent matches between the same teams and tactics in one vectorized run.
+        Returns a BatchResult with per-match goal arrays; this match's own score is left untouched.
+        With event_driven=True matches jump between possession changes instead of ticking every minute.
+        """
+        from batch_engine import BatchMatchEngine, EventDrivenEngine
+        engine = EventDrivenEngine if event_driven else BatchMatchEngine
+        return engine(self, seed=seed).simulate(n)
 #
 #
 # mock_data_1 = MockDataSource("Jane Doe")
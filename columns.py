@@ -0,0 +1,25 @@
+def flat_rows(columns):
+    """
+    Flat memoryviews over a dict of NumPy columns, for Column. Indexing one yields a plain Python scalar, far
+    cheaper than going through NumPy for a single element. Rebuild them whenever the arrays behind them are
+    replaced.
+    """
+    return {name: memoryview(column.reshape(-1)) for name, column in columns.items()}
+
+
+class Column:
+    """
+    Attribute of a view over one row of struct-of-arrays storage (roster_store.RosterStore,
+    physics_world.PhysicsWorld), kept in the storage's column of the same name. Views keep the flat_rows dict
+    of their storage in _rows and their flat row in _row.
+    """
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, view, owner=None):
+        if view is None:
+            return self
+        return view._rows[self.name][view._row]
+
+    def __set__(self, view, value):
+        view._rows[self.name][view._row] = value
@@ -0,0 +1,78 @@
+import copy
+
+import numpy as np
+
+from batch_engine import BatchMatchEngine, OUTCOMES
+from classes import Match, Team, HOME, AWAY
+
+
+class OutcomeDistribution:
+    def __init__(self, scorelines):
+        """
+        scorelines[h, a] is the exact probability that a match ends h-a.
+        """
+        self.scorelines = scorelines
+
+    def probabilities(self):
+        """
+        Returns win/draw/loss probabilities keyed like Match.outcome_phase.
+        """
+        home_wins = float(np.tril(self.scorelines, -1).sum())
+        away_wins = float(np.triu(self.scorelines, 1).sum())
+        return {
+            OUTCOMES[0]: home_wins,
+            OUTCOMES[1]: away_wins,
+            OUTCOMES[2]: float(np.trace(self.scorelines)),
+        }
+
+    def expected_goals(self):
+        """
+        Returns (home, away) expected goals per match.
+        """
+        goals = np.arange(self.scorelines.shape[0])
+        return float(goals @ self.scorelines.sum(axis=1)), float(goals @ self.scorelines.sum(axis=0))
+
+
+def minute_transitions(match):
+    """
+    Returns a (2, 2, 2) array: [side in possession, ball lost, goal scored] -> probability for one minute.
+    The active player is uniform over the side's active players, so their pass and shot chances are mixed evenly.
+    The engine's setup phase runs on copies of the teams, so their active-player index is left as it was.
+    """
+    match = copy.copy(match)
+    match.home_team = Team(match.home_team.players, match.home_team.tactics)
+    match.away_team = Team(match.away_team.players, match.away_team.tactics)
+    engine = BatchMatchEngine(match)
+    transitions = np.zeros((2, 2, 2))
+    for side, count in enumerate(engine.active_counts):
+        passes = engine.pass_table[side, :count]
+        shots = engine.shot_table[side, :count]
+        transitions[side, 0, 0] = np.mean(passes * (1 - shots))
+        transitions[side, 0, 1] = np.mean(passes * shots)
+        transitions[side, 1, 0] = np.mean((1 - passes) * (1 - shots))
+        transitions[side, 1, 1] = np.mean((1 - passes) * shots)
+    return transitions
+
+
+def exact_outcome_distribution(home_team, away_team, home_tactic="normal", away_tactic="normal", minutes=None):
+    """
+    Computes the exact scoreline distribution of Match by propagating probability mass over
+    (possession, home goals, away goals) one minute at a time, instead of sampling matches.
+    """
+    minutes = minutes or Match.MATCH_TIME
+    match = Match(home_team, away_team, home_tactic, away_tactic, record_events=False)
+    transitions = minute_transitions(match)
+
+    size = minutes + 1
+    # mass[side, h, a]: probability of being at score h-a with `side` in possession at the start of the minute
+    mass = np.zeros((2, size, size))
+    mass[:, 0, 0] = 0.5
+    scored = np.zeros((2, size, size))
+    for _ in range(minutes):
+        # A goal moves the home side's mass one row down and the away side's mass one column right
+        scored[HOME, 1:, :] = mass[HOME, :-1, :]
+        scored[AWAY, :, 1:] = mass[AWAY, :, :-1]
+        kept = transitions[:, 0, 0, None, None] * mass + transitions[:, 0, 1, None, None] * scored
+        lost = transitions[:, 1, 0, None, None] * mass + transitions[:, 1, 1, None, None] * scored
+        mass = kept + lost[::-1]
+    return OutcomeDistribution(mass.sum(axis=0))
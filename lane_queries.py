@@ -0,0 +1,98 @@
+import math
+
+import numpy as np
+
+LANE_TOLERANCE = 1  # A player closer than this to a lane blocks it
+PASS_DISTANCE = 200  # Teammates further away than this are not considered for a pass
+
+
+def distance_to_segment(x1, y1, x2, y2, px, py):
+    """
+    Distance from (px, py) to the segment between (x1, y1) and (x2, y2), ends included.
+    """
+    dx, dy = x2 - x1, y2 - y1
+    length = dx * dx + dy * dy
+    t = 0 if length == 0 else min(1, max(0, ((px - x1) * dx + (py - y1) * dy) / length))
+    return math.hypot(x1 + t * dx - px, y1 + t * dy - py)
+
+
+def segment_distances(x1, y1, x2, y2, px, py):
+    """
+    Vectorized distance_to_segment: segment and point coordinates broadcast against each other.
+    """
+    dx, dy = x2 - x1, y2 - y1
+    length = dx * dx + dy * dy
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = np.clip(((px - x1) * dx + (py - y1) * dy) / length, 0, 1)
+    t = np.where(length == 0, 0, t)
+    return np.hypot(x1 + t * dx - px, y1 + t * dy - py)
+
+
+class LaneQueries:
+    def __init__(self, players, tolerance=LANE_TOLERANCE):
+        """
+        Per-frame geometry for decision code, taken from one snapshot of the players' positions.
+        Each group of answers is computed for every player at once the first time any player asks for it:
+        who stands on each shooting lane (player to the center of the goal they attack), and teammate offsets
+        and distances. The snapshot goes stale as soon as anyone moves, so build a new one every frame.
+        """
+        self.players = players
+        self.tolerance = tolerance
+        self.slots = {id(player): slot for slot, player in enumerate(players)}
+        self.x = np.array([player.x for player in players], dtype=float)
+        self.y = np.array([player.y for player in players], dtype=float)
+        teams = {}
+        self.team = np.array([teams.setdefault(player.color, len(teams)) for player in players], dtype=np.intp)
+        self._shot_blockers = None
+        self._offsets = None
+
+    def slot(self, player):
+        return self.slots[id(player)]
+
+    @property
+    def shot_blockers(self):
+        """
+        (n, n) mask: [i, j] is True when player j stands on player i's shooting lane.
+        """
+        if self._shot_blockers is None:
+            goal_x = np.array([p.away_goal.x + p.away_goal.width // 2 for p in self.players], dtype=float)
+            goal_y = np.array([p.away_goal.y + p.away_goal.height // 2 for p in self.players], dtype=float)
+            distances = segment_distances(self.x[:, None], self.y[:, None], goal_x[:, None], goal_y[:, None],
+                                          self.x[None, :], self.y[None, :])
+            blockers = distances < self.tolerance
+            np.fill_diagonal(blockers, False)
+            self._shot_blockers = blockers
+        return self._shot_blockers
+
+    def shot_obstructions(self, player):
+        """
+        The players standing on player's shooting lane, in list order.
+        """
+        return [self.players[j] for j in np.flatnonzero(self.shot_blockers[self.slot(player)])]
+
+    def shot_clear(self, player):
+        return not self.shot_blockers[self.slot(player)].any()
+
+    @property
+    def offsets(self):
+        """
+        (dx, dy, distance) matrices: [i, j] is the vector and distance from player i to player j.
+        """
+        if self._offsets is None:
+            dx = self.x[None, :] - self.x[:, None]
+            dy = self.y[None, :] - self.y[:, None]
+            self._offsets = dx, dy, np.hypot(dx, dy)
+        return self._offsets
+
+    def teammate_in_direction(self, player, direction, max_distance=PASS_DISTANCE):
+        """
+        Nearest teammate ahead of player along direction and closer than max_distance, or None.
+        """
+        i = self.slot(player)
+        dx, dy, distance = self.offsets
+        ahead = dx[i] * direction[0] + dy[i] * direction[1] > 0
+        candidates = ahead & (self.team == self.team[i]) & (distance[i] < max_distance)
+        candidates[i] = False
+        if not candidates.any():
+            return None
+        return self.players[int(np.argmin(np.where(candidates, distance[i], np.inf)))]
@@ -0,0 +1,231 @@
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from batch_engine import BatchMatchEngine
+from classes import Match
+from monte_carlo import chunk_sizes, run_chunks
+
+POINTS_FOR_WIN = 3
+POINTS_FOR_DRAW = 1
+SEASON_CHUNK = 2_000  # Seasons simulated together per task in Monte Carlo runs
+
+
+def round_robin(n_teams, double=True):
+    """
+    Builds a round-robin schedule with the circle method.
+    Returns a list of rounds, each a list of (home, away) team indices. With an odd number of teams
+    one team rests every round. A double round robin repeats the schedule with venues swapped.
+    """
+    slots = list(range(n_teams))
+    if n_teams % 2:
+        slots.append(None)  # Bye
+    half = len(slots) // 2
+    rounds = []
+    for number in range(len(slots) - 1):
+        fixtures = []
+        for i in range(half):
+            home, away = slots[i], slots[-1 - i]
+            if home is None or away is None:
+                continue
+            if i == 0 and number % 2:
+                # The fixed slot would otherwise always play at home
+                home, away = away, home
+            fixtures.append((home, away))
+        rounds.append(fixtures)
+        slots = [slots[0], slots[-1]] + slots[1:-1]
+    if double:
+        rounds += [[(away, home) for home, away in fixtures] for fixtures in rounds]
+    return rounds
+
+
+class Standings:
+    def __init__(self, n_teams, seasons=1):
+        """
+        League table kept up to date one result at a time.
+        Every counter has a leading season axis, so the same table tracks one season or
+        thousands of Monte Carlo seasons recorded in lockstep.
+        """
+        shape = (seasons, n_teams)
+        self.played = np.zeros(shape, dtype=np.int32)
+        self.won = np.zeros(shape, dtype=np.int32)
+        self.drawn = np.zeros(shape, dtype=np.int32)
+        self.lost = np.zeros(shape, dtype=np.int32)
+        self.goals_for = np.zeros(shape, dtype=np.int32)
+        self.goals_against = np.zeros(shape, dtype=np.int32)
+        self.points = np.zeros(shape, dtype=np.int32)
+        # head_to_head[s, i, j] = points team i took from its matches against team j
+        self.head_to_head = np.zeros((seasons, n_teams, n_teams), dtype=np.int16)
+
+    @property
+    def goal_difference(self):
+        return self.goals_for - self.goals_against
+
+    def record(self, home, away, home_goals, away_goals):
+        """
+        Adds one fixture result. Goals are ints for a single season or arrays with one entry per season.
+        """
+        home_win = np.asarray(home_goals > away_goals)
+        draw = np.asarray(home_goals == away_goals)
+        away_win = np.asarray(home_goals < away_goals)
+        home_points = POINTS_FOR_WIN * home_win + POINTS_FOR_DRAW * draw
+        away_points = POINTS_FOR_WIN * away_win + POINTS_FOR_DRAW * draw
+
+        for team, goals_for, goals_against, won, lost, points in (
+                (home, home_goals, away_goals, home_win, away_win, home_points),
+                (away, away_goals, home_goals, away_win, home_win, away_points)):
+            self.played[:, team] += 1
+            self.won[:, team] += won
+            self.drawn[:, team] += draw
+            self.lost[:, team] += lost
+            self.goals_for[:, team] += goals_for
+            self.goals_against[:, team] += goals_against
+            self.points[:, team] += points
+        self.head_to_head[:, home, away] += home_points
+        self.head_to_head[:, away, home] += away_points
+
+    def ranking(self):
+        """
+        Returns team indices ordered from first to last place, one row per season.
+        Ties are broken by goal difference, then by head-to-head points among the teams still level,
+        then by goals scored.
+        """
+        goal_difference = self.goal_difference
+        level = (self.points[:, :, None] == self.points[:, None, :]) & \
+                (goal_difference[:, :, None] == goal_difference[:, None, :])
+        head_to_head = np.einsum("sij,sij->si", self.head_to_head, level)
+        return np.lexsort((-self.goals_for, -head_to_head, -goal_difference, -self.points), axis=-1)
+
+    def table(self, teams=None, season=0):
+        """
+        Returns the table of one season as a list of rows, first place first.
+        """
+        rows = []
+        for position, team in enumerate(self.ranking()[season], start=1):
+            rows.append({
+                "position": position,
+                "team": teams[team] if teams is not None else int(team),
+                "played": int(self.played[season, team]),
+                "won": int(self.won[season, team]),
+                "drawn": int(self.drawn[season, team]),
+                "lost": int(self.lost[season, team]),
+                "goals_for": int(self.goals_for[season, team]),
+                "goals_against": int(self.goals_against[season, team]),
+                "goal_difference": int(self.goal_difference[season, team]),
+                "points": int(self.points[season, team]),
+            })
+        return rows
+
+
+class SeasonOutcomes:
+    def __init__(self, position_counts, relegation_spots=3):
+        """
+        position_counts[team, position] is how many simulated seasons the team finished in that position.
+        """
+        self.position_counts = position_counts
+        self.relegation_spots = relegation_spots
+
+    @property
+    def n(self):
+        return int(self.position_counts[0].sum())
+
+    def merge(self, other):
+        self.position_counts += other.position_counts
+        return self
+
+    def position_probabilities(self):
+        return self.position_counts / self.n
+
+    def title_probabilities(self):
+        return self.position_counts[:, 0] / self.n
+
+    def relegation_probabilities(self):
+        if not self.relegation_spots:
+            return np.zeros(len(self.position_counts))
+        return self.position_counts[:, -self.relegation_spots:].sum(axis=1) / self.n
+
+
+def _play_fixture(home_team, away_team, home_tactic, away_tactic, seed):
+    # Player stats are not kept: a pool worker would only credit its own copy of the rosters
+    match = Match(home_team, away_team, home_tactic, away_tactic, record_events=False, rng=random.Random(seed),
+                  record_stats=False)
+    match.setup_phase()
+    match.simulation_phase()
+    return match.home_goals, match.away_goals
+
+
+def _simulate_season_chunk(teams, tactics, rounds, n, seed_sequence):
+    """
+    Plays n seasons side by side: every fixture is simulated n times with the batch engine and fed
+    straight into the standings, so no match objects or per-season results are kept.
+    """
+    rng = np.random.default_rng(seed_sequence)
+    standings = Standings(len(teams), seasons=n)
+    for fixtures in rounds:
+        for home, away in fixtures:
+            match = Match(teams[home], teams[away], tactics[home], tactics[away], record_events=False,
+                          record_stats=False)
+            result = BatchMatchEngine(match, seed=rng).simulate(n)
+            standings.record(home, away, result.home_goals, result.away_goals)
+
+    ranking = standings.ranking()
+    size = len(teams)
+    positions = np.broadcast_to(np.arange(size), ranking.shape)
+    return np.bincount((ranking * size + positions).ravel(), minlength=size * size).reshape(size, size)
+
+
+class League:
+    def __init__(self, teams, tactics=None, double_round_robin=True):
+        """
+        A competition between Team objects. tactics holds one tactic name per team.
+        """
+        self.teams = teams
+        self.tactics = tactics or ["normal"] * len(teams)
+        self.rounds = round_robin(len(teams), double_round_robin)
+
+    def fixtures(self):
+        """
+        Yields (round number, home Team, away Team) in schedule order.
+        """
+        for number, fixtures in enumerate(self.rounds, start=1):
+            for home, away in fixtures:
+                yield number, self.teams[home], self.teams[away]
+
+    def simulate_season(self, workers=1, seed=None):
+        """
+        Plays one season round by round and returns its Standings.
+        With workers > 1 the fixtures of each round are played concurrently in a process pool and
+        recorded as they finish. Each fixture gets its own seed, so results do not depend on workers.
+        """
+        seeder = random.Random(seed)
+        standings = Standings(len(self.teams))
+
+        if workers == 1:
+            for fixtures in self.rounds:
+                for home, away in fixtures:
+                    standings.record(home, away, *_play_fixture(
+                        self.teams[home], self.teams[away], self.tactics[home], self.tactics[away],
+                        seeder.getrandbits(64)))
+            return standings
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for fixtures in self.rounds:
+                futures = {pool.submit(_play_fixture, self.teams[home], self.teams[away], self.tactics[home],
+                                       self.tactics[away], seeder.getrandbits(64)): (home, away)
+                           for home, away in fixtures}
+                for future in as_completed(futures):
+                    standings.record(*futures[future], *future.result())
+        return standings
+
+    def simulate_seasons(self, n, workers=None, seed=None, relegation_spots=3, chunk_size=SEASON_CHUNK):
+        """
+        Runs n Monte Carlo seasons and returns SeasonOutcomes with title and relegation probabilities.
+        Seasons are simulated in chunks across a process pool; only the finishing-position counts survive a chunk.
+        """
+        chunks = [(self.teams, self.tactics, self.rounds, size) for size in chunk_sizes(n, chunk_size)]
+        size = len(self.teams)
+        outcomes = SeasonOutcomes(np.zeros((size, size), dtype=np.int64), relegation_spots)
+        for _, position_counts in run_chunks(_simulate_season_chunk, chunks, workers, seed, in_order=False):
+            outcomes.position_counts += position_counts
+        return outcomes
@@ -0,0 +1,179 @@
+import math
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from batch_engine import BatchMatchEngine, OUTCOMES
+from classes import Match
+
+CHUNK_SIZE = 10_000  # Matches per task: enough chunks to keep a pool busy
+STREAM_CHUNK_SIZE = 2_000  # Matches between estimates when streaming
+CONFIDENCE_Z = 1.96  # Normal quantile of the reported intervals (95%)
+
+
+class MonteCarloResult:
+    def __init__(self, outcomes=None, scorelines=None):
+        """
+        Aggregated counts over many simulated matches.
+        scorelines[h, a] is the number of matches that ended h-a.
+        """
+        size = Match.MATCH_TIME + 1
+        self.outcomes = outcomes or {outcome: 0 for outcome in OUTCOMES}
+        self.scorelines = scorelines if scorelines is not None else np.zeros((size, size), dtype=np.int64)
+
+    @classmethod
+    def from_batch(cls, batch):
+        size = Match.MATCH_TIME + 1
+        flat = np.bincount(batch.home_goals * size + batch.away_goals, minlength=size * size)
+        return cls(batch.outcome_counts(), flat.reshape(size, size).astype(np.int64))
+
+    @property
+    def n(self):
+        return sum(self.outcomes.values())
+
+    def merge(self, other):
+        """
+        Adds the counts of another result into this one and returns self.
+        """
+        for outcome, count in other.outcomes.items():
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + count
+        self.scorelines += other.scorelines
+        return self
+
+    def probabilities(self):
+        """
+        Returns the outcome histogram normalised to probabilities, or NaN for each while no match has been counted.
+        """
+        total = self.n
+        if not total:
+            return {outcome: math.nan for outcome in self.outcomes}
+        return {outcome: count / total for outcome, count in self.outcomes.items()}
+
+    def confidence_intervals(self, z=CONFIDENCE_Z):
+        """
+        Returns a Wilson score interval (low, high) per outcome probability.
+        Unlike the normal approximation it stays inside [0, 1] and is sensible for lopsided matchups.
+        """
+        total = self.n
+        intervals = {}
+        for outcome, count in self.outcomes.items():
+            if not total:
+                intervals[outcome] = (0.0, 1.0)
+                continue
+            p = count / total
+            centre = (p + z * z / (2 * total)) / (1 + z * z / total)
+            half_width = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / (1 + z * z / total)
+            intervals[outcome] = (max(0.0, centre - half_width), min(1.0, centre + half_width))
+        return intervals
+
+    def precision(self, z=CONFIDENCE_Z):
+        """
+        Largest half-width among the outcome intervals.
+        """
+        return max((high - low) / 2 for low, high in self.confidence_intervals(z).values())
+
+    def expected_goals(self):
+        """
+        Returns (home, away) mean goals per match, or NaN for both while no match has been counted.
+        """
+        total = self.n
+        if not total:
+            return math.nan, math.nan
+        goals = np.arange(self.scorelines.shape[0])
+        home = float(goals @ self.scorelines.sum(axis=1)) / total
+        away = float(goals @ self.scorelines.sum(axis=0)) / total
+        return home, away
+
+
+def chunk_sizes(n, chunk_size):
+    """
+    Splits n items into chunks of chunk_size, the last one holding the remainder.
+    """
+    sizes = [chunk_size] * (n // chunk_size)
+    if n % chunk_size:
+        sizes.append(n % chunk_size)
+    return sizes
+
+
+def run_chunks(task, chunks, workers=None, seed=None, in_order=True):
+    """
+    Calls task(*args, seed_sequence) for each args tuple in chunks, in this process when workers is 1 and across
+    a process pool otherwise, and yields (chunk index, result). Chunk i always gets the i-th child of one
+    SeedSequence, so as long as the chunks are fixed independently of workers, a given seed gives the same
+    results whatever the number of workers. Results come in chunk order, or as they finish with in_order=False.
+    """
+    workers = workers or os.cpu_count() or 1
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    if workers == 1:
+        for index, (args, seed_sequence) in enumerate(zip(chunks, seeds)):
+            yield index, task(*args, seed_sequence)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(task, *args, seed_sequence): index
+                   for index, (args, seed_sequence) in enumerate(zip(chunks, seeds))}
+        for future in (futures if in_order else as_completed(futures)):
+            yield futures[future], future.result()
+
+
+def _simulate_chunk(home_team, away_team, home_tactic, away_tactic, n, seed_sequence):
+    match = Match(home_team, away_team, home_tactic, away_tactic)
+    batch = BatchMatchEngine(match, seed=seed_sequence).simulate(n)
+    return MonteCarloResult.from_batch(batch)
+
+
+def simulate_many(home_team, away_team, n, workers=None, home_tactic="normal", away_tactic="normal",
+                  seed=None, chunk_size=CHUNK_SIZE):
+    """
+    Simulates n matches across a process pool and returns a MonteCarloResult.
+    Chunks are seeded by run_chunks, so a given seed reproduces the same counts whatever the number of workers.
+    """
+    chunks = [(home_team, away_team, home_tactic, away_tactic, size) for size in chunk_sizes(n, chunk_size)]
+    result = MonteCarloResult()
+    for _, chunk in run_chunks(_simulate_chunk, chunks, workers, seed):
+        result.merge(chunk)
+    return result
+
+
+def stream_many(home_team, away_team, precision=0.01, time_budget=None, max_matches=None, workers=1,
+                home_tactic="normal", away_tactic="normal", seed=None, chunk_size=STREAM_CHUNK_SIZE,
+                z=CONFIDENCE_Z):
+    """
+    Simulates in chunks and yields the running MonteCarloResult after each one, until every outcome's
+    confidence interval is within precision (a half-width), time_budget seconds have passed or max_matches
+    have been played. The yielded result is the live running total, so copy it to keep a snapshot.
+    Chunk i always gets the i-th child of one SeedSequence and chunks are merged in order, so a given seed
+    yields the same sequence of estimates whatever the number of workers; with workers > 1 up to
+    workers chunks are simulated ahead and discarded when the run stops.
+    """
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    seed_sequence = np.random.SeedSequence(seed)
+    result = MonteCarloResult()
+    played = 0
+    pending = deque()  # (size, future) per chunk in flight, or (size, result) when running in-process
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while True:
+            while len(pending) < workers:
+                queued = sum(size for size, _ in pending)
+                size = chunk_size if max_matches is None else min(chunk_size, max_matches - played - queued)
+                if size <= 0:
+                    break
+                args = (home_team, away_team, home_tactic, away_tactic, size, seed_sequence.spawn(1)[0])
+                pending.append((size, pool.submit(_simulate_chunk, *args) if pool else _simulate_chunk(*args)))
+            if not pending:
+                return  # max_matches was reached, or was zero to begin with
+            size, chunk = pending.popleft()
+            result.merge(chunk.result() if pool else chunk)
+            played += size
+            yield result
+            if (result.precision(z) <= precision
+                    or (deadline is not None and time.perf_counter() >= deadline)
+                    or (max_matches is not None and played >= max_matches)):
+                return
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
@@ -0,0 +1,676 @@
+import math
+import random
+
+from columns import Column
+from lane_queries import PASS_DISTANCE, LaneQueries, distance_to_segment
+from physics_world import PLAYER_RADIUS, BALL_REACH, PhysicsWorld, decide
+from spatial_hash import SpatialHash
+
+# Pitch dimensions in simulation units (one unit is one pixel in the pygame view)
+WIDTH, HEIGHT = 800, 600
+GOAL_WIDTH, GOAL_HEIGHT = 100, 150
+FRAME_TIME = 0.1  # Simulated seconds per step
+CONTACT_DISTANCE = 50  # Players closer than this may get stuck on each other
+POSSESSION_RADIUS = 30  # A player this close to the ball counts as being in possession
+
+# Team colors double as team identity: teammates are players of the same color
+BLUE = (0, 0, 255)
+RED = (255, 0, 0)
+
+
+def point_on_line(x1, y1, x2, y2, px, py, tolerance=1):
+    """
+    Check if a point (px, py) lies on the line segment between (x1, y1) and (x2, y2).
+    A tolerance is added to account for players being close to, but not exactly on, the line.
+    """
+    # Calculate line equation: y = mx + c
+    if x2 - x1 == 0:  # Vertical line
+        return abs(px - x1) < tolerance
+    m = (y2 - y1) / (x2 - x1)
+    c = y1 - m * x1
+
+    # Check if point is on the line
+    return abs(py - (m * px + c)) < tolerance
+
+
+def obstructions_on_lane(players, x1, y1, x2, y2, exclude=None, grid=None, tolerance=1):
+    """
+    Returns the players closer than tolerance to the segment from (x1, y1) to (x2, y2), in list order.
+    With a grid (a SpatialHash built over players) only players in cells along the segment are tested.
+    """
+    candidates = players if grid is None else [players[index] for index in
+                                               grid.query_segment(x1, y1, x2, y2, tolerance)]
+    return [p for p in candidates
+            if p is not exclude and distance_to_segment(x1, y1, x2, y2, p.x, p.y) < tolerance]
+
+
+def check_and_resolve_collisions(players, football, grid=None, lanes=None):
+    """
+    Updates possession flags and pushes overlapping players apart.
+    Both go through a spatial hash, so only players near the ball or near each other are ever compared.
+    Lane checks read from lanes (a LaneQueries for this frame) when given.
+    Both players of a pair react to each other, and every push is worked out from the positions before any
+    of them is applied, so the outcome does not depend on the order of the players.
+    """
+    if grid is None:
+        grid = SpatialHash().rebuild(players)
+    near_ball = set(grid.query(football.x, football.y, POSSESSION_RADIUS))
+    for index, player in enumerate(players):
+        player.in_possession = index in near_ball
+        player.in_collision = None
+    pushes = {}  # Player index -> x and y displacements from each of its contacts
+    for i, j in grid.pairs(CONTACT_DISTANCE):
+        overlapping = players[i].collides_with(players[j], football, players, grid, lanes)
+        players[j].collides_with(players[i], football, players, grid, lanes)
+        if overlapping:
+            push_x, push_y = players[i].collision_push(players[j])
+            for index, sign in ((i, -1), (j, 1)):
+                moves = pushes.setdefault(index, ([], []))
+                moves[0].append(sign * push_x)
+                moves[1].append(sign * push_y)
+    # fsum is exact, so several pushes add up to the same position whatever order they came in
+    for index, (moves_x, moves_y) in pushes.items():
+        players[index].x += math.fsum(moves_x)
+        players[index].y += math.fsum(moves_y)
+
+
+class Goal:
+    def __init__(self, x, y, width, height):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+
+class PlayerStats:
+    def __init__(self, kick_range, kick_dispersion):
+        self.kick_range = kick_range  # Max distance from which player can attempt a shot
+        self.kick_dispersion = kick_dispersion  # Angle of dispersion when shooting
+
+
+class Player:
+    # Physical state lives in a PhysicsWorld; the player is a view over one of its slots
+    x = Column()
+    y = Column()
+    previous_x = Column()
+    previous_y = Column()
+    rotation = Column()
+    speed = Column()
+    sprint_speed = Column()
+    fatigue = Column()
+    sprinting = Column()
+    in_possession = Column()
+
+    def __init__(self, name, x, y, color, goal_home, goal_away, stats=None, rotation=0, world=None, index=None):
+        if world is None:
+            world, index = PhysicsWorld(1, 1), 0  # A player on its own gets a world of its own
+        self._world = world
+        self._rows = world.player_rows
+        self._row = index
+        self.x = x
+        self.y = y
+        self.previous_x = x  # Storing initial positions as previous positions initially
+        self.previous_y = y
+        self.color = color
+        self.speed = 5
+        self.stats = stats or PlayerStats(kick_range=150, kick_dispersion=15)  # Default stats if none provided
+        self.in_possession = False
+        self.rotation = rotation
+        self.home_goal = goal_home
+        self.away_goal = goal_away
+        self._in_collision = False
+        self._in_collision_with = None
+        self.name = name
+        self.sprinting = False
+        self.sprint_speed = 7
+        self.collision_duration = 0
+        self.fatigue = 100
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def world(self):
+        return self._world
+
+    @property
+    def in_collision(self):
+        return self._in_collision
+
+    @in_collision.setter
+    def in_collision(self, with_whom):
+        if with_whom is None:
+            self._in_collision_with = None
+            self._in_collision = False
+        else:
+            self._in_collision_with = with_whom
+            self._in_collision = True
+
+    @property
+    def in_collision_with(self):
+        return self._in_collision_with
+
+    def collides_with(self, other, ball, players=None, grid=None, lanes=None):
+        distance = math.hypot(self.x - other.x, self.y - other.y)
+        # point_on_line(self.x, self.y, self.away_goal.x + self.away_goal.width // 2,
+        #               self.away_goal.y + self.away_goal.height // 2, p.x, p.y)]
+        if self.in_possession and distance < CONTACT_DISTANCE and isinstance(other, Player) \
+                and not self.is_path_clear(self.away_goal, players or [self, other], grid, lanes):
+            self.handle_collision()
+        if distance >= 2 * PLAYER_RADIUS:
+            return False
+        # Keep the nearest of several overlapping players
+        current = self.in_collision_with
+        if current is None or distance < math.hypot(self.x - current.x, self.y - current.y):
+            self.in_collision = other
+        return True
+
+    def collision_push(self, other):
+        """
+        Returns how far self moves to get out of other; other moves the same distance the opposite way.
+        """
+        # Calculate the vector between the centers
+        delta_x = other.x - self.x
+        delta_y = other.y - self.y
+        distance = math.sqrt(delta_x ** 2 + delta_y ** 2)
+        if distance == 0:
+            # Exactly on top of each other: separate them along the way they came in, or else sideways
+            delta_x, delta_y = other.previous_x - self.previous_x, other.previous_y - self.previous_y
+            distance = math.sqrt(delta_x ** 2 + delta_y ** 2)
+            if distance == 0:
+                delta_x, delta_y, distance = 1, 0, 1
+            delta_x, delta_y, distance = delta_x / distance, delta_y / distance, 1
+
+        # Calculate the overlap (amount by which they penetrate each other)
+        overlap = 2 * PLAYER_RADIUS - distance
+
+        # Push the players away from each other by half of the overlap amount
+        return (overlap / 2) * (delta_x / distance), (overlap / 2) * (delta_y / distance)
+
+    def resolve_collision(self, other):
+        push_x, push_y = self.collision_push(other)
+        self.x -= push_x
+        self.y -= push_y
+        other.x += push_x
+        other.y += push_y
+
+    def handle_collision(self):
+        self.collision_duration += 1
+
+        if self.collision_duration > 5 and self.fatigue > 20 and self.in_possession:
+            self.sprinting = True
+
+    def move_towards(self, target_x, target_y):
+        # Store current position as previous position
+        self.previous_x = self.x
+        self.previous_y = self.y
+        self.rotation = math.degrees(math.atan2(target_y - self.y, target_x - self.x))
+
+        delta_x = target_x - self.x
+        delta_y = target_y - self.y
+        distance = max(1, (delta_x ** 2 + delta_y ** 2) ** 0.5)
+        delta_x /= distance
+        delta_y /= distance
+
+        if self.sprinting:
+            # Use sprint speed when sprinting
+            self.x += self.sprint_speed * delta_x
+            self.y += self.sprint_speed * delta_y
+
+            # Decrease fatigue when sprinting
+            self.fatigue = max(0, self.fatigue - 0.5)
+            if self.fatigue == 0:
+                self.sprinting = False
+
+        else:
+            # Update the object's position
+            self.x += self.speed * delta_x
+            self.y += self.speed * delta_y
+
+    def possess_ball(self, ball):
+        if ball.possessed_by != self and ball.possessed_by is not None:
+            self.play_around(ball.possessed_by, ball)
+        if ball.possessed_by is None:
+            ball.change_possession(to_player=self)
+        else:
+            ball.change_possession(to_player=self)
+
+    def ball_in_reach(self, ball):
+        distance = ((self.x - ball.x) ** 2 + (self.y - ball.y) ** 2) ** 0.5
+        return distance < BALL_REACH
+
+    def push_ball(self, ball):
+        # Check for collision with ball
+        if self.ball_in_reach(ball):
+            # Calculate direction based on movement
+            dx = self.x - self.previous_x
+            dy = self.y - self.previous_y
+            ball.set_velocity(dx, dy)
+
+    def can_shoot(self, goal):
+        # Calculate distance to the center of the goal
+        if self.in_possession:
+            distance_to_goal = ((self.x - goal.x) ** 2 + (self.y - (goal.y + goal.height / 2)) ** 2) ** 0.5
+            return distance_to_goal <= self.stats.kick_range
+        return False
+
+    def shoot(self, goal):
+        # Get direction to the goal center
+        direction_x = (goal.x + goal.width / 2) - self.x
+        direction_y = (goal.y + goal.height / 2) - self.y
+
+        # Introduce dispersion
+        dispersion_angle = random.uniform(-self.stats.kick_dispersion, self.stats.kick_dispersion)
+        cos_angle = math.cos(math.radians(dispersion_angle))
+        sin_angle = math.sin(math.radians(dispersion_angle))
+
+        new_direction_x = direction_x * cos_angle - direction_y * sin_angle
+        new_direction_y = direction_x * sin_angle + direction_y * cos_angle
+
+        # Normalize direction for a fixed shooting speed (e.g., 7 units/frame)
+        distance = (new_direction_x ** 2 + new_direction_y ** 2) ** 0.5
+        new_direction_x /= distance
+        new_direction_y /= distance
+
+        # Update ball's position with the shot direction
+        # This is a simple implementation; in reality, you might want to add acceleration, deceleration, etc.
+        return new_direction_x * 7, new_direction_y * 7
+
+    def direction_to_avoid_obstacle(self, obstruction):
+        """
+        Determine whether the player should move above or below the obstructing player to avoid them.
+        Return 'above' or 'below' based on the best direction to move.
+        """
+        if self.y < obstruction.y:
+            return "above"
+        else:
+            return "below"
+
+    def navigate_around_obstacle(self, obstruction):
+        """
+        Update the player's position to move around the obstructing player.
+        """
+        direction = self.direction_to_avoid_obstacle(obstruction)
+        if direction == "above":
+            target_y = obstruction.y - 30  # Move 30 units above the obstruction
+        else:
+            target_y = obstruction.y + 30  # Move 30 units below the obstruction
+
+        self.move_towards(self.x, target_y)  # Move vertically to avoid the obstruction
+
+    def is_path_clear(self, target, all_players, grid=None, lanes=None):
+        """
+        Check if the path between player and the center of the goal is clear of other players.
+        """
+        if lanes is not None and target is self.away_goal:
+            return lanes.shot_clear(self)
+        return not obstructions_on_lane(all_players, self.x, self.y, target.x + target.width // 2,
+                                        target.y + target.height // 2, exclude=self, grid=grid)
+
+    def should_shoot_at_goal(self, all_players, grid=None, lanes=None):
+        # Use conditions to decide if a shot should be taken
+        return self.is_path_clear(self.away_goal, all_players, grid, lanes) and self.can_shoot(self.away_goal)
+
+    def should_pass_ball(self, other_players, lanes=None):
+        # Use conditions to decide if a pass should be made
+        teammate = self.find_teammate_in_direction(self.goal_direction(), other_players, lanes=lanes)
+        return teammate is not None
+
+    def should_dribble_around(self):
+        # Use conditions to decide if dribbling around is a good idea
+        # This is just a placeholder, you'd want more sophisticated logic here
+        return self.in_collision
+
+    def pass_ball(self, ball, all_players, lanes=None):
+        # Logic to pass the ball to a teammate
+        teammate = self.find_teammate_in_direction(self.goal_direction(), all_players, lanes=lanes)
+
+    def dribble_around(self, ball):
+        # Logic to dribble around an obstacle or opponent
+        # This will involve moving the player and the ball
+        return
+
+    def goal_direction(self):
+        # Return a normalized vector pointing towards the goal
+        goal_dir = (self.away_goal.x - self.x, self.away_goal.y - self.y)
+        magnitude = math.sqrt(goal_dir[0] ** 2 + goal_dir[1] ** 2)
+        return (goal_dir[0] / magnitude, goal_dir[1] / magnitude)
+
+    def find_teammate_in_direction(self, direction, players, max_distance=PASS_DISTANCE, lanes=None):
+        # Find nearest teammate in the given direction
+        if lanes is not None:
+            return lanes.teammate_in_direction(self, direction, max_distance)
+        nearest_teammate = None
+        min_distance = max_distance
+
+        for player in players:
+            if player == self or player.color != self.color:  # Skip ourselves and the other team
+                continue
+
+            dx = player.x - self.x
+            dy = player.y - self.y
+            distance = math.sqrt(dx ** 2 + dy ** 2)
+
+            # Check if player is in the desired direction
+            dot_product = dx * direction[0] + dy * direction[1]
+
+            if dot_product > 0 and distance < min_distance:
+                nearest_teammate = player
+                min_distance = distance
+
+        return nearest_teammate
+
+    def play_around(self, other, ball):
+        # Determine the attacking direction (based on the previous position)
+        attack_dir = (self.previous_x - self.x, self.previous_y - self.y)
+
+        # Normalize this direction for unit length
+        magnitude = math.sqrt(attack_dir[0] ** 2 + attack_dir[1] ** 2)
+        if magnitude == 0:
+            magnitude = 1  # To avoid division by zero
+        attack_dir = (attack_dir[0] / magnitude, attack_dir[1] / magnitude)
+
+        # Compute a perpendicular direction to the attacking direction
+        # This gives two potential directions: clockwise (cw) and counterclockwise (ccw)
+        perp_dir_cw = (-attack_dir[1], attack_dir[0])
+        perp_dir_ccw = (attack_dir[1], -attack_dir[0])
+
+        # Check which side of the defending player is more open
+        # We do this by adding a bit of distance in both directions and seeing which one is further from the defending player
+        test_distance = 25  # This can be adjusted based on your requirements
+        pos_cw = (self.x + test_distance * perp_dir_cw[0], self.y + test_distance * perp_dir_cw[1])
+        pos_ccw = (self.x + test_distance * perp_dir_ccw[0], self.y + test_distance * perp_dir_ccw[1])
+
+        dist_cw = math.sqrt((pos_cw[0] - other.x) ** 2 + (pos_cw[1] - other.y) ** 2)
+        dist_ccw = math.sqrt((pos_ccw[0] - other.x) ** 2 + (pos_ccw[1] - other.y) ** 2)
+
+        # Pick the direction that's further from the defending player
+        if dist_cw > dist_ccw:
+            bypass_dir = perp_dir_cw
+        else:
+            bypass_dir = perp_dir_ccw
+
+        # Check for a teammate in the direction of the goal
+        goal_dir = (self.away_goal.x - self.x, self.away_goal.y - self.y)
+        magnitude = math.sqrt(goal_dir[0] ** 2 + goal_dir[1] ** 2)
+        goal_dir = (goal_dir[0] / magnitude, goal_dir[1] / magnitude)
+
+        # teammate = self.find_teammate_in_direction(goal_dir, all_players)
+        teammate = False
+
+        if teammate:
+            # Pass the ball to the teammate
+            pass_dir = (teammate.x - self.x, teammate.y - self.y)
+            magnitude = math.sqrt(pass_dir[0] ** 2 + pass_dir[1] ** 2)
+            pass_dir = (pass_dir[0] / magnitude, pass_dir[1] / magnitude)
+
+            ball_speed = 7  # Adjust as needed
+            dx = ball_speed * pass_dir[0]
+            dy = ball_speed * pass_dir[1]
+        else:
+            # Push the ball in the bypass direction and move to retrieve it
+            ball_push_distance = 15  # Adjust based on how far you want the ball to be pushed
+            dx = ball_push_distance * bypass_dir[0]
+            dy = ball_push_distance * bypass_dir[1]
+            self.x += self.speed * bypass_dir[0] * 4
+            self.y += self.speed * bypass_dir[1] * 4
+
+        ball.set_velocity(dx, dy)
+
+    def decision_making(self, ball, other_players, grid=None, lanes=None):
+        """
+        Moves this player for the frame, seeing whatever earlier players already changed. PhysicsEngine runs
+        physics_world.decide instead, the same decisions for everyone at once from one snapshot; this stays
+        for code that drives a single player by hand.
+        """
+        #
+        # # Decision-making for the player with the ball
+        # obstructions_for_shooting = [p for p in other_players if p != self and
+        #                              point_on_line(self.x, self.y, self.away_goal.x + self.away_goal.width // 2,
+        #                                            self.away_goal.y + self.away_goal.height // 2, p.x, p.y)]
+        #
+        # if not self.ball_in_reach(ball):
+        #     self.move_towards(ball.x, ball.y)
+        # else:
+        #     self.push_ball(ball)
+        #
+        # if obstructions_for_shooting:  # Check if we have any obstructions
+        #     # Navigate around the first obstruction in the list
+        #     self.navigate_around_obstacle(obstructions_for_shooting[0])
+        #
+        # else:
+        #     if self.is_path_clear(self.away_goal, other_players) and self.can_shoot(self.away_goal):
+        #         # If path is clear and player is in shooting range
+        #         dx, dy = self.shoot(self.away_goal)
+        #         ball.x += dx
+        #         ball.y += dy
+        #     elif self.in_collision:
+        #         dx, dy = self.shoot(self.away_goal)
+        #         ball.x += dx
+        #         ball.y += dy
+
+        if lanes is not None:
+            obstructions = lanes.shot_obstructions(self)
+        else:
+            obstructions = obstructions_on_lane(other_players, self.x, self.y,
+                                                self.away_goal.x + self.away_goal.width // 2,
+                                                self.away_goal.y + self.away_goal.height // 2, exclude=self, grid=grid)
+
+        if ball.possessed_by is None:
+            self.sprinting = True
+        else:
+            self.sprinting = False
+
+        if not self.ball_in_reach(ball):
+            self.move_towards(ball.x, ball.y)
+            return
+        elif self.ball_in_reach(ball):
+            self.possess_ball(ball)
+            return
+        else:
+            if obstructions:
+                self.navigate_around_obstacle(obstructions[0])
+                self.push_ball(ball)
+            elif self.should_shoot_at_goal(other_players, grid, lanes):
+                self.push_ball(ball)
+                dx, dy = self.shoot(self.away_goal)
+                ball.set_velocity(dx, dy)
+                ball.change_possession(from_player=self, to_player=None)
+            elif self.should_pass_ball(other_players, lanes) and self.in_possession:
+                self.push_ball(ball)
+                self.pass_ball(ball, other_players, lanes)
+            elif self.is_path_clear(self.away_goal, other_players, grid, lanes):
+                self.move_towards(self.away_goal.x, self.away_goal.y)
+                self.push_ball(ball)
+            elif not self.is_path_clear(self.away_goal, other_players, grid, lanes) and self.in_collision:
+                self.play_around(self.in_collision_with, ball)
+
+            elif self.should_dribble_around():
+                self.dribble_around(ball)
+
+
+class Ball:
+    x = Column()
+    y = Column()
+    dx = Column()
+    dy = Column()
+    friction = Column()
+    possession_cooldown = Column()
+
+    def __init__(self, x, y, world=None, index=None):
+        if world is None:
+            world, index = PhysicsWorld(1, 0), 0
+        self._world = world
+        self._rows = world.ball_rows
+        self._row = index
+        self.x = x
+        self.y = y
+        self.dx = 0
+        self.dy = 0
+        self.possessed_by: Player or None = None
+        self.friction = 0.92
+        self.possession_cooldown = 0
+
+    @property
+    def world(self):
+        return self._world
+
+    def change_possession(self, from_player=None, to_player=None):
+        if self.possession_cooldown > 0:
+            return 
+        if isinstance(from_player, Player):
+            from_player.in_possession = False
+        if isinstance(to_player, Player):
+            to_player.in_possession = True
+        self.possessed_by = to_player
+        self.possession_cooldown += 3
+
+    def update(self):
+        self.possession_cooldown -= 1 if self.possession_cooldown > 0 else 0
+        self.update_position()
+
+    def update_position(self):
+        self.x += self.dx
+        self.y += self.dy
+
+        self.dx *= self.friction
+        self.dy *= self.friction
+
+        if abs(self.dx) < 0.1:
+            self.dx = 0
+        if abs(self.dy) < 0.1:
+            self.dy = 0
+
+    def set_velocity(self, dx, dy):
+        self.dx = dx
+        self.dy = dy
+
+
+def _pitch_of(players, ball):
+    """
+    Returns (world, match) of the pitch that players, in slot order, and ball occupy. Players and a ball
+    that are not laid out like that, e.g. built one by one on worlds of their own, are moved onto a new
+    one-pitch world first; their views keep working, they just read and write there from then on.
+    """
+    world, match = ball.world, ball._row
+    if all(player.world is world and player._row == world.player_index(match, slot)
+           for slot, player in enumerate(players)) and world.players_per_match == len(players):
+        return world, match
+    world = PhysicsWorld(1, len(players))
+    views = [(player, world.player_rows, slot) for slot, player in enumerate(players)] + [(ball, world.ball_rows, 0)]
+    for view, rows, index in views:
+        for name, column in rows.items():
+            column[index] = view._rows[name][view._row]
+        view._world, view._rows, view._row = world, rows, index
+    return world, 0
+
+
+class PhysicsEngine:
+    def __init__(self, players, ball, home_goal=None, away_goal=None):
+        """
+        Headless 2D match: advances players and ball one fixed step of FRAME_TIME simulated seconds at a time,
+        as fast as the CPU allows. Rendering, recording and pacing are observers, called with the engine
+        after every step; any of them may call stop().
+        """
+        self.players = players
+        self.ball = ball
+        self.world, self.match = _pitch_of(players, ball)
+        self.columns = self.world.pitch(self.match)
+        self.slots = {id(player): slot for slot, player in enumerate(players)}
+        self.home_goal = home_goal
+        self.away_goal = away_goal
+        self.frame = 0
+        self.running = True
+        self.observers = []
+        self.grid = SpatialHash()
+        self.lanes = None
+
+    @property
+    def time(self):
+        """Simulated seconds since kick-off."""
+        return self.frame * FRAME_TIME
+
+    def add_observer(self, observer):
+        self.observers.append(observer)
+        return observer
+
+    def remove_observer(self, observer):
+        self.observers.remove(observer)
+
+    def stop(self):
+        self.running = False
+
+    def step(self):
+        # Contacts come from the grid and lane geometry from one vectorized snapshot, both built once per frame
+        self.grid.rebuild(self.players)
+        self.lanes = LaneQueries(self.players)
+        check_and_resolve_collisions(self.players, self.ball, self.grid, self.lanes)
+        self.ball.update()
+        self.decide()
+        self.frame += 1
+        for observer in self.observers:
+            observer(self)
+
+    def decide(self):
+        """
+        Runs every player's decision for this frame through physics_world.decide on the engine's pitch of its
+        PhysicsWorld: a read-only snapshot of the pitch is taken and the next frame is written in place.
+        """
+        world, match, ball = self.world, self.match, self.ball
+        holders = world.ball_rows["holder"]
+        holders[match] = -1 if ball.possessed_by is None else self.slots.get(id(ball.possessed_by), -1)
+        world.take_snapshot(match)
+        decide(*self.columns)
+        holder = holders[match]
+        ball.possessed_by = self.players[holder] if holder >= 0 else None
+
+    def run(self, frames=None):
+        """
+        Steps the engine for the given number of frames, or until an observer stops it.
+        """
+        self.running = True
+        steps = 0
+        while self.running and (frames is None or steps < frames):
+            self.step()
+            steps += 1
+        return self
+
+    def run_for(self, seconds):
+        """
+        Steps the engine through the given amount of simulated time.
+        """
+        return self.run(int(round(seconds / FRAME_TIME)))
+
+
+def kickoff(width=WIDTH, height=HEIGHT):
+    """
+    Builds the default one-on-one setup used by the pygame view and returns its engine.
+    """
+    home_goal = Goal(0, height // 2 - GOAL_HEIGHT // 2, GOAL_WIDTH, GOAL_HEIGHT)
+    away_goal = Goal(width - GOAL_WIDTH, height // 2 - GOAL_HEIGHT // 2, GOAL_WIDTH, GOAL_HEIGHT)
+    players = [
+        Player("Alena", width // 3, height // 2, BLUE, goal_home=home_goal, goal_away=away_goal, rotation=0),
+        Player("Alek", 2 * width // 3, height // 2, RED, goal_home=away_goal, goal_away=home_goal, rotation=180),
+    ]
+    return PhysicsEngine(players, Ball(width // 2, height // 2), home_goal, away_goal)
+
+
+def kickoff_world(matches, width=WIDTH, height=HEIGHT):
+    """
+    Builds the kickoff() setup on many pitches that share one PhysicsWorld.
+    Returns the world and one engine per pitch; world.step() advances every pitch at once.
+    """
+    world = PhysicsWorld(matches, 2)
+    engines = []
+    for match in range(matches):
+        home_goal = Goal(0, height // 2 - GOAL_HEIGHT // 2, GOAL_WIDTH, GOAL_HEIGHT)
+        away_goal = Goal(width - GOAL_WIDTH, height // 2 - GOAL_HEIGHT // 2, GOAL_WIDTH, GOAL_HEIGHT)
+        players = [
+            Player("Alena", width // 3, height // 2, BLUE, goal_home=home_goal, goal_away=away_goal, rotation=0,
+                   world=world, index=world.player_index(match, 0)),
+            Player("Alek", 2 * width // 3, height // 2, RED, goal_home=away_goal, goal_away=home_goal, rotation=180,
+                   world=world, index=world.player_index(match, 1)),
+        ]
+        ball = Ball(width // 2, height // 2, world=world, index=match)
+        engines.append(PhysicsEngine(players, ball, home_goal, away_goal))
+    return world, engines
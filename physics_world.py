@@ -0,0 +1,309 @@
+import numpy as np
+
+from columns import flat_rows
+from lane_queries import LANE_TOLERANCE, segment_distances
+
+PLAYER_RADIUS = 15
+BALL_REACH = 25  # 15 (player radius) + 10 (ball radius): a player this close can play the ball
+POSSESSION_COOLDOWN = 3  # Frames after a change of possession before the ball can change hands again
+
+# Player.play_around: how far to either side the open space is probed, how hard the ball is pushed into it
+# and how many strides the player takes after it
+BYPASS_PROBE = 25
+BYPASS_PUSH = 15
+BYPASS_STRIDES = 4
+SHOT_SPEED = 7  # Ball speed per frame right after a shot
+
+# Column name -> dtype for every per-body value kept in a PhysicsWorld
+PLAYER_COLUMNS = {
+    "x": np.float64,
+    "y": np.float64,
+    "previous_x": np.float64,
+    "previous_y": np.float64,
+    "rotation": np.float64,
+    "speed": np.float64,
+    "sprint_speed": np.float64,
+    "fatigue": np.float64,
+    "sprinting": np.bool_,
+    "in_possession": np.bool_,
+    # Shooting: reach and spread of a shot in degrees, and the center of the goal the player attacks
+    "kick_range": np.float64,
+    "kick_dispersion": np.float64,
+    "goal_x": np.float64,
+    "goal_y": np.float64,
+}
+BALL_COLUMNS = {
+    "x": np.float64,
+    "y": np.float64,
+    "dx": np.float64,
+    "dy": np.float64,
+    "friction": np.float64,
+    "possession_cooldown": np.int32,
+    "holder": np.int32,  # Slot of the player in possession on the ball's pitch, or -1
+}
+
+
+def move_players(players, target_x, target_y, moving):
+    """
+    Vectorized Player.move_towards over a dict of player columns: every player selected by moving takes one
+    step towards its target. Targets and mask broadcast against the columns.
+    """
+    x, y = players["x"], players["y"]
+    delta_x = target_x - x
+    delta_y = target_y - y
+    np.copyto(players["previous_x"], x, where=moving)
+    np.copyto(players["previous_y"], y, where=moving)
+    np.copyto(players["rotation"], np.degrees(np.arctan2(delta_y, delta_x)), where=moving)
+
+    sprinting = players["sprinting"]
+    distance = np.maximum(1, np.hypot(delta_x, delta_y))
+    step = np.where(sprinting, players["sprint_speed"], players["speed"]) * moving / distance
+    x += step * delta_x
+    y += step * delta_y
+
+    # Sprinting costs fatigue, and an exhausted player stops sprinting
+    tired = moving & sprinting
+    fatigue = players["fatigue"]
+    np.copyto(fatigue, np.maximum(0, fatigue - 0.5), where=tired)
+    sprinting &= ~(tired & (fatigue == 0))
+
+
+def decide(snapshot_players, snapshot_balls, players, balls, rng=None):
+    """
+    Evaluates every player's decision for one frame, for all pitches at once.
+    Reads only the snapshot columns, shaped (matches, players) and (matches,), and writes the next frame into
+    players and balls, which must start out as copies of the snapshot. No decision sees another one's effect,
+    so the result does not depend on the order of the players.
+
+    This follows Player.decision_making: everyone sprints while the ball is loose, and players out of reach
+    run at the ball. Players within reach of a ball someone else holds challenge for it as in possess_ball:
+    each steps around the holder as in play_around. Of the challengers, or of everyone within reach when there
+    are none, the one nearest the ball (then the leftmost, then the topmost) plays it: a challenger pushes it
+    past the holder, and takes possession unless the ball just changed hands. Others within reach of a loose
+    ball hold their position.
+
+    With an rng (a numpy Generator), the holder also plays the ball forward, as decision_making's attacking
+    branches intend but never reach: when on the ball with the goal within kick_range and nobody on the lane
+    they shoot, with a random dispersion, otherwise they dribble towards the goal. A ball several players
+    can reach then goes to one of them at random, so a challenger can win it off the holder.
+    Returns the shooter's slot per pitch, or -1.
+    """
+    x, y = snapshot_players["x"], snapshot_players["y"]
+    ball_x, ball_y = snapshot_balls["x"][:, None], snapshot_balls["y"][:, None]
+    holder = snapshot_balls["holder"]
+    cooldown = snapshot_balls["possession_cooldown"]
+    players["sprinting"][:] = (holder < 0)[:, None]
+
+    distance = np.hypot(ball_x - x, ball_y - y)
+    in_reach = distance < BALL_REACH
+    move_players(players, ball_x, ball_y, ~in_reach)
+
+    shooters = np.full(len(holder), -1, dtype=np.intp)
+    if rng is not None:
+        m = np.flatnonzero(holder >= 0)
+        h = holder[m]
+        on_ball = in_reach[m, h] & snapshot_players["in_possession"][m, h]
+        m, h = m[on_ball], h[on_ball]
+        goal_x, goal_y = snapshot_players["goal_x"][m, h], snapshot_players["goal_y"][m, h]
+        lane = segment_distances(x[m, h][:, None], y[m, h][:, None], goal_x[:, None], goal_y[:, None], x[m], y[m])
+        lane[np.arange(len(m)), h] = np.inf
+        shooting = ((np.hypot(goal_x - x[m, h], goal_y - y[m, h]) <= snapshot_players["kick_range"][m, h])
+                    & ~(lane < LANE_TOLERANCE).any(axis=1))
+
+        # Out of range or blocked: dribble towards the goal, pushing the ball along (move_towards, push_ball)
+        dribbling = np.zeros(x.shape, dtype=bool)
+        dribbling[m[~shooting], h[~shooting]] = True
+        move_players(players, snapshot_players["goal_x"], snapshot_players["goal_y"], dribbling)
+        dm, dh = m[~shooting], h[~shooting]
+        balls["dx"][dm] = players["x"][dm, dh] - x[dm, dh]
+        balls["dy"][dm] = players["y"][dm, dh] - y[dm, dh]
+
+        m, h, goal_x, goal_y = m[shooting], h[shooting], goal_x[shooting], goal_y[shooting]
+        if len(m):
+            spread = snapshot_players["kick_dispersion"][m, h]
+            angle = np.radians(rng.uniform(-spread, spread))
+            aim_x, aim_y = goal_x - x[m, h], goal_y - y[m, h]
+            shot_x = aim_x * np.cos(angle) - aim_y * np.sin(angle)
+            shot_y = aim_x * np.sin(angle) + aim_y * np.cos(angle)
+            length = np.maximum(np.hypot(shot_x, shot_y), 1e-9)
+            balls["dx"][m] = SHOT_SPEED * shot_x / length
+            balls["dy"][m] = SHOT_SPEED * shot_y / length
+            shooters[m] = h
+            released = cooldown[m] == 0
+            players["in_possession"][m[released], h[released]] = False
+            balls["holder"][m[released]] = -1
+            balls["possession_cooldown"][m[released]] += POSSESSION_COOLDOWN
+            in_reach = in_reach.copy()
+            in_reach[m] = False  # The ball has been kicked, so nobody plays it this frame
+
+    matches = np.flatnonzero(in_reach.any(axis=1))
+    if not len(matches):
+        return shooters
+    held = holder[matches]
+    reaching = in_reach[matches]
+    challenging = reaching & (held[:, None] >= 0) & (np.arange(x.shape[1]) != held[:, None])
+    if rng is None:
+        # Ties are broken by position rather than slot, so reordering the players cannot change the winner
+        candidates = np.where(challenging.any(axis=1, keepdims=True), challenging, reaching)
+        nearest = np.where(candidates, distance[matches], np.inf)
+        tied = nearest == nearest.min(axis=1, keepdims=True)
+        leftmost = np.where(tied, x[matches], np.inf)
+        tied &= leftmost == leftmost.min(axis=1, keepdims=True)
+        winner = np.argmin(np.where(tied, y[matches], np.inf), axis=1)
+    else:
+        # A contested ball goes to any of the players within reach with equal chance
+        winner = np.argmax(np.where(reaching, rng.random(reaching.shape), -1), axis=1)
+
+    challenger, c = np.nonzero(challenging)
+    if len(c):
+        m, h = matches[challenger], held[challenger]
+        # Step sideways relative to where the player came from, to whichever side is further from the holder
+        attack_x = snapshot_players["previous_x"][m, c] - x[m, c]
+        attack_y = snapshot_players["previous_y"][m, c] - y[m, c]
+        magnitude = np.hypot(attack_x, attack_y)
+        magnitude[magnitude == 0] = 1
+        side_x, side_y = -attack_y / magnitude, attack_x / magnitude
+        clockwise = (np.hypot(x[m, c] + BYPASS_PROBE * side_x - x[m, h], y[m, c] + BYPASS_PROBE * side_y - y[m, h])
+                     > np.hypot(x[m, c] - BYPASS_PROBE * side_x - x[m, h], y[m, c] - BYPASS_PROBE * side_y - y[m, h]))
+        side_x = np.where(clockwise, side_x, -side_x)
+        side_y = np.where(clockwise, side_y, -side_y)
+        stride = snapshot_players["speed"][m, c] * BYPASS_STRIDES
+        players["x"][m, c] += stride * side_x
+        players["y"][m, c] += stride * side_y
+        # Only the challenger who plays the ball pushes it past the holder
+        pushing = c == winner[challenger]
+        balls["dx"][m[pushing]] = BYPASS_PUSH * side_x[pushing]
+        balls["dy"][m[pushing]] = BYPASS_PUSH * side_y[pushing]
+
+    # Ball.change_possession: nothing changes hands while the cooldown runs
+    ready = cooldown[matches] == 0
+    m, w, h = matches[ready], winner[ready], held[ready]
+    players["in_possession"][m[h >= 0], h[h >= 0]] = False
+    players["in_possession"][m, w] = True
+    balls["holder"][m] = w
+    balls["possession_cooldown"][m] += POSSESSION_COOLDOWN
+    return shooters
+
+
+class PhysicsWorld:
+    def __init__(self, matches=1, players_per_match=2):
+        """
+        Struct-of-arrays state for many independent pitches: every player column has shape
+        (matches, players_per_match) and every ball column has shape (matches,). physics.Player and
+        physics.Ball objects are views over one slot, so scalar code and the vectorized steps below
+        read and write the same numbers.
+        """
+        self.matches = matches
+        self.players_per_match = players_per_match
+        self.frame = 0
+        self.players = {name: np.zeros((matches, players_per_match), dtype=dtype)
+                        for name, dtype in PLAYER_COLUMNS.items()}
+        self.balls = {name: np.zeros(matches, dtype=dtype) for name, dtype in BALL_COLUMNS.items()}
+        self.balls["holder"][:] = -1
+        # Read-only copy of the frame being decided; the columns above are the write buffer for the next one.
+        # Only take_snapshot() writes the buffers behind it, through the (source, destination) pairs it keeps.
+        self.snapshot_players, self.snapshot_balls = {}, {}
+        self._snapshot_copies = {None: []}  # Pitch (None for all of them) -> pairs of columns take_snapshot copies
+        for columns, snapshot in ((self.players, self.snapshot_players), (self.balls, self.snapshot_balls)):
+            for name, column in columns.items():
+                buffer = column.copy()
+                self._snapshot_copies[None].append((column, buffer))
+                snapshot[name] = buffer.view()
+                snapshot[name].flags.writeable = False
+        # For the per-object views; every vectorized update below writes in place, so they never go stale
+        self.player_rows = flat_rows(self.players)
+        self.ball_rows = flat_rows(self.balls)
+
+    def player_index(self, match, slot):
+        """
+        Returns the flat row of a player slot, as used by player views.
+        """
+        return match * self.players_per_match + slot
+
+    def move_towards(self, target_x, target_y, moving=None):
+        """
+        Every player selected by moving (default: all) takes one step towards its target.
+        Targets and mask broadcast against (matches, players_per_match).
+        """
+        if moving is None:
+            moving = np.ones((self.matches, self.players_per_match), dtype=bool)
+        move_players(self.players, target_x, target_y, moving)
+
+    def take_snapshot(self, match=None):
+        """
+        Freezes the current state of every pitch, or of pitch match only, into the snapshot columns that
+        decide() reads.
+        """
+        copies = self._snapshot_copies.get(match)
+        if copies is None:
+            rows = slice(match, match + 1)
+            copies = self._snapshot_copies[match] = [(column[rows], buffer[rows])
+                                                     for column, buffer in self._snapshot_copies[None]]
+        for column, buffer in copies:
+            np.copyto(buffer, column)
+
+    def pitch(self, match):
+        """
+        decide()'s arguments for pitch match alone: (snapshot players, snapshot balls, players, balls) column
+        dicts shaped like a one-pitch world's. They are views, so decisions on them write straight into the world.
+        """
+        rows = slice(match, match + 1)
+        return tuple({name: column[rows] for name, column in columns.items()}
+                     for columns in (self.snapshot_players, self.snapshot_balls, self.players, self.balls))
+
+    def update_balls(self):
+        """
+        Vectorized Ball.update: possession cooldowns tick down, every ball moves and friction slows it.
+        """
+        balls = self.balls
+        cooldown = balls["possession_cooldown"]
+        np.subtract(cooldown, 1, out=cooldown, where=cooldown > 0)
+        for position, velocity in (("x", "dx"), ("y", "dy")):
+            balls[position] += balls[velocity]
+            balls[velocity] *= balls["friction"]
+            balls[velocity][np.abs(balls[velocity]) < 0.1] = 0
+
+    def resolve_collisions(self):
+        """
+        Vectorized Player.resolve_collision: every overlapping pair on the same pitch is pushed apart by half
+        its overlap. All pushes are computed from the same positions and applied together, so unlike the
+        pair-by-pair scalar version the result does not depend on the order of the players.
+        Returns the (matches, players, players) contact mask.
+        """
+        x, y = self.players["x"], self.players["y"]
+        delta_x = x[:, None, :] - x[:, :, None]  # [match, i, j] points from player i to player j
+        delta_y = y[:, None, :] - y[:, :, None]
+        distance = np.hypot(delta_x, delta_y)
+        contact = distance < 2 * PLAYER_RADIUS
+        diagonal = np.arange(self.players_per_match)
+        contact[:, diagonal, diagonal] = False
+
+        # Exactly on top of each other, so separate them sideways: the lower slot moves left
+        coincident = contact & (distance == 0)
+        if coincident.any():
+            delta_x = np.where(coincident, np.sign(diagonal[None, :] - diagonal[:, None]), delta_x)
+            distance = np.where(coincident, 1, distance)
+
+        push = np.where(contact, (2 * PLAYER_RADIUS - distance) / 2 / np.where(contact, distance, 1), 0)
+        x -= (push * delta_x).sum(axis=2)
+        y -= (push * delta_y).sum(axis=2)
+        return contact
+
+    def step(self, target_x=None, target_y=None, rng=None):
+        """
+        Advances every pitch by one frame in the order PhysicsEngine.step uses: collisions, then balls,
+        then players. Without explicit targets the players' moves come from decide() on a snapshot of the
+        frame, and its shooters (slot per pitch, or -1) are returned; with them, every player just steps
+        towards its target.
+        """
+        self.resolve_collisions()
+        self.update_balls()
+        shooters = None
+        if target_x is None:
+            self.take_snapshot()
+            shooters = decide(self.snapshot_players, self.snapshot_balls, self.players, self.balls, rng)
+        else:
+            self.move_towards(target_x, target_y)
+        self.frame += 1
+        return shooters
+
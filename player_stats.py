@@ -0,0 +1,132 @@
+import os
+import random
+
+import numpy as np
+
+from classes import Match
+from monte_carlo import chunk_sizes, run_chunks
+from roster_store import STAT_FIELDS
+
+CHUNK_SIZE = 500  # Matches per task
+
+
+class StatsAggregator:
+    def __init__(self, players):
+        """
+        Streaming totals, means and variances of every StatsPlayer counter per match, for a fixed list of
+        players sharing one RosterStore. Everything lives in (players, len(STAT_FIELDS)) arrays updated with
+        Welford's method, so memory stays the same however many matches are observed, and aggregates built
+        in other processes over the same players can be merged in.
+        """
+        players = list(players)
+        stores = {id(player.store) for player in players}
+        if len(stores) > 1:
+            raise ValueError("All aggregated players must share one RosterStore")
+        self.store = players[0].store if players else None
+        self.players = players  # Keeps the rows in use; a store hands the rows of dropped players out again
+        self.names = [player.name for player in players]
+        self.rows = np.array([player.row for player in players], dtype=np.intp)
+        shape = (len(players), len(STAT_FIELDS))
+        self.matches = 0
+        self.totals = np.zeros(shape, dtype=np.int64)
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)  # Sum of squared deviations from the mean
+        self.baseline = self._counters()
+
+    def _counters(self):
+        return self.store.stats[self.rows].astype(np.int64) if self.store is not None else np.zeros_like(self.totals)
+
+    def observe(self):
+        """
+        Adds one match: whatever the players' StatsPlayer counters gained since the previous call.
+        """
+        counters = self._counters()
+        self.add(counters - self.baseline)
+        self.baseline = counters
+
+    def add(self, counts):
+        """
+        Adds one match as a (players, fields) array, or several at once as (matches, players, fields).
+        """
+        counts = np.asarray(counts)
+        if counts.ndim == 2:
+            counts = counts[None]
+        mean = counts.mean(axis=0)
+        self._combine(len(counts), counts.sum(axis=0), mean, ((counts - mean) ** 2).sum(axis=0))
+
+    def _combine(self, matches, totals, mean, m2):
+        # Chan et al.'s pairwise update; with a single match it is Welford's step
+        if not matches:
+            return
+        combined = self.matches + matches
+        delta = mean - self.mean
+        self.m2 += m2 + delta ** 2 * (self.matches * matches / combined)
+        self.mean += delta * (matches / combined)
+        self.totals += totals
+        self.matches = combined
+
+    def merge(self, other):
+        """
+        Adds another aggregate over the same players into this one and returns self.
+        """
+        if other.totals.shape != self.totals.shape:
+            raise ValueError("Aggregates cover different players")
+        self._combine(other.matches, other.totals, other.mean, other.m2)
+        return self
+
+    @property
+    def variance(self):
+        """
+        Sample variance per player and counter; zero until two matches were seen.
+        """
+        return self.m2 / (self.matches - 1) if self.matches > 1 else np.zeros_like(self.m2)
+
+    def summary(self, index):
+        """
+        {field: (total, mean per match, standard deviation)} for the player at index.
+        """
+        std = np.sqrt(self.variance[index])
+        return {field: (int(self.totals[index, column]), float(self.mean[index, column]), float(std[column]))
+                for column, field in enumerate(STAT_FIELDS)}
+
+    def __getstate__(self):
+        # Only the aggregate travels between processes, not the roster it was read from
+        state = self.__dict__.copy()
+        state["store"] = None
+        state["players"] = None
+        state["baseline"] = None
+        return state
+
+
+def _players(home_team, away_team):
+    # A team playing itself still counts each player once
+    return list(dict.fromkeys(home_team.players + away_team.players))
+
+
+def _aggregate_chunk(home_team, away_team, home_tactic, away_tactic, n, seed_sequence):
+    rng = random.Random(int.from_bytes(seed_sequence.generate_state(4).tobytes(), "little"))
+    aggregator = StatsAggregator(_players(home_team, away_team))
+    for _ in range(n):
+        Match(home_team, away_team, home_tactic, away_tactic, record_events=False, rng=rng).simulate_match()
+        aggregator.observe()
+    return aggregator
+
+
+def aggregate_player_stats(home_team, away_team, n, workers=None, home_tactic="normal", away_tactic="normal",
+                           seed=None, chunk_size=CHUNK_SIZE):
+    """
+    Plays n matches across a process pool and returns a StatsAggregator over both rosters.
+    Workers simulate on their own copies of the rosters, so their counters come back as merged aggregates and
+    the totals are then credited to the players' StatsPlayer rows here. Chunks are seeded by
+    monte_carlo.run_chunks, so a given seed gives the same aggregate whatever the number of workers.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = [(home_team, away_team, home_tactic, away_tactic, size) for size in chunk_sizes(n, chunk_size)]
+    aggregator = StatsAggregator(_players(home_team, away_team))
+    for _, chunk in run_chunks(_aggregate_chunk, chunks, workers, seed):
+        aggregator.merge(chunk)
+    # With one worker the matches were played here and already credited to the players directly
+    if workers > 1:
+        aggregator.store.credit(aggregator.rows.tolist(), aggregator.totals.ravel().tolist())
+    aggregator.baseline = aggregator._counters()
+    return aggregator
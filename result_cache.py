@@ -0,0 +1,150 @@
+import hashlib
+import io
+import json
+import sqlite3
+from collections import OrderedDict
+
+import numpy as np
+
+from batch_engine import ENGINE_VERSION
+from classes import Match, Tactics
+from monte_carlo import CHUNK_SIZE, MonteCarloResult, simulate_many
+
+MEMORY_SIZE = 256  # Results kept in the in-memory LRU tier
+
+
+def rules_fingerprint():
+    """
+    Hash of everything outside the rosters that shapes a result: the engine version, the tactic table and
+    the Match constants. Changing any of them changes every key, so stale results are never served.
+    """
+    rules = {
+        "engine": ENGINE_VERSION,
+        "tactics": Tactics.TACTIC_EFFECTS,
+        "match": {name: getattr(Match, name) for name in ("HOME_ADVANTAGE", "MATCH_TIME", "PASS_BONUS",
+                                                          "PASS_THRESHOLD", "SHOT_BONUS", "SHOT_THRESHOLD",
+                                                          "RED_CARD_CHANCE")},
+    }
+    return hashlib.sha256(json.dumps(rules, sort_keys=True).encode()).hexdigest()
+
+
+def _side(team, tactic, home_advantage):
+    """
+    The effective ratings and injury chance of every player who would start, in roster order.
+    """
+    ratings = team.effective_ratings(tactic, home_advantage)
+    # The players Match.setup_phase will put on the pitch, read without resetting the team's live index
+    return [[tactic]] + [list(ratings.for_player(team.roster_position(player)).values()) + [player.injury_chance]
+                         for player in team.starters()]
+
+
+def query_key(home_team, away_team, n, home_tactic="normal", away_tactic="normal", seed=None,
+              chunk_size=CHUNK_SIZE, rules=None):
+    """
+    Content address of a simulate_many query: identical rosters, tactics, rules, seed and sample size
+    give the same key, whichever Team and Player objects carry them.
+    """
+    query = {
+        "rules": rules or rules_fingerprint(),
+        "home": _side(home_team, home_tactic, Match.HOME_ADVANTAGE),
+        "away": _side(away_team, away_tactic, 1.0),
+        "n": n,
+        "seed": seed,
+        "chunk_size": chunk_size,
+    }
+    return hashlib.sha256(json.dumps(query, sort_keys=True).encode()).hexdigest()
+
+
+def _copy(result):
+    return MonteCarloResult(dict(result.outcomes), result.scorelines.copy())
+
+
+class ResultCache:
+    def __init__(self, path=None, memory_size=MEMORY_SIZE):
+        """
+        Two-tier cache of MonteCarloResults: a bounded in-memory LRU in front of an optional SQLite file
+        that survives restarts. Rows written under other rules are dropped when the file is opened.
+        Callers always get their own copy, so merging into a returned result never alters the cache.
+        """
+        self.memory_size = memory_size
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.connection = None
+        if path is not None:
+            self.connection = sqlite3.connect(path)
+            self.connection.execute("CREATE TABLE IF NOT EXISTS results "
+                                    "(key TEXT PRIMARY KEY, rules TEXT, outcomes TEXT, scorelines BLOB)")
+            with self.connection:
+                self.connection.execute("DELETE FROM results WHERE rules != ?", (rules_fingerprint(),))
+
+    def _remember(self, key, result):
+        self.memory[key] = result
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+
+    def get(self, key):
+        """
+        Returns a copy of the cached result for key, or None.
+        """
+        result = self.memory.get(key)
+        if result is not None:
+            self.memory.move_to_end(key)
+            self.hits += 1
+            return _copy(result)
+        if self.connection is not None:
+            row = self.connection.execute("SELECT outcomes, scorelines FROM results WHERE key = ?",
+                                          (key,)).fetchone()
+            if row is not None:
+                result = MonteCarloResult(json.loads(row[0]), np.load(io.BytesIO(row[1])))
+                self._remember(key, result)
+                self.disk_hits += 1
+                return _copy(result)
+        self.misses += 1
+        return None
+
+    def put(self, key, result, rules=None):
+        result = _copy(result)
+        self._remember(key, result)
+        if self.connection is not None:
+            scorelines = io.BytesIO()
+            np.save(scorelines, result.scorelines)
+            with self.connection:
+                self.connection.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                                        (key, rules or rules_fingerprint(), json.dumps(result.outcomes),
+                                         scorelines.getvalue()))
+
+    def simulate_many(self, home_team, away_team, n, workers=None, home_tactic="normal", away_tactic="normal",
+                      seed=None, chunk_size=CHUNK_SIZE):
+        """
+        monte_carlo.simulate_many answered from the cache when the same query was seen before.
+        An unseeded query asks for a fresh sample, so it is always simulated and never stored.
+        """
+        if seed is None:
+            return simulate_many(home_team, away_team, n, workers, home_tactic, away_tactic, seed, chunk_size)
+        rules = rules_fingerprint()
+        key = query_key(home_team, away_team, n, home_tactic, away_tactic, seed, chunk_size, rules)
+        result = self.get(key)
+        if result is None:
+            result = simulate_many(home_team, away_team, n, workers, home_tactic, away_tactic, seed, chunk_size)
+            self.put(key, result, rules)
+        return result
+
+    def clear(self):
+        self.memory.clear()
+        if self.connection is not None:
+            with self.connection:
+                self.connection.execute("DELETE FROM results")
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
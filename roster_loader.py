@@ -0,0 +1,234 @@
+import csv
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+from classes import Player, Team
+from roster_store import RosterStore, SOURCE_COLUMNS
+
+POOL_SIZE = 4  # Read connections a SqliteRosterSource keeps open for concurrent loads
+
+
+def _number(value):
+    # CSV cells arrive as text; booleans come as True/False from Python exports
+    return {"True": 1, "False": 0, "": 0}.get(value, value)
+
+
+class CsvRosterSource:
+    def __init__(self, path):
+        """
+        Players from a CSV file with a header row naming team, name, every SOURCE_COLUMNS attribute and
+        optionally updated. A player's key is its line in the file, so rows should only ever be appended.
+        """
+        self.path = path
+
+    def teams(self):
+        with open(self.path, newline="") as roster_file:
+            return sorted({row["team"] for row in csv.DictReader(roster_file)})
+
+    def read(self, teams, since=None):
+        """
+        Returns (key, updated, team, name, *SOURCE_COLUMNS values) records of the given teams' players, or of
+        everyone when teams is None. A text file cannot be queried by stamp, so since is ignored and
+        refresh() diffs everything it reads.
+        """
+        teams = None if teams is None else set(teams)
+        with open(self.path, newline="") as roster_file:
+            return [(line, int(row.get("updated") or 0), row["team"], row["name"],
+                     *(_number(row[source]) for source in SOURCE_COLUMNS))
+                    for line, row in enumerate(csv.DictReader(roster_file)) if teams is None or row["team"] in teams]
+
+    def close(self):
+        pass
+
+
+class SqliteRosterSource:
+    def __init__(self, path, pool_size=POOL_SIZE):
+        """
+        Players from a local SQLite database (see write_roster_database for the schema), read through a pool
+        of up to pool_size read-only connections shared by whichever threads load teams.
+        """
+        self.path = path
+        self.pool_size = pool_size
+        self.pool = queue.LifoQueue()
+        self.opened = 0
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def connection(self):
+        """
+        Lends an idle pooled connection, opening one if the pool is not full yet, else waiting for one.
+        """
+        try:
+            connection = self.pool.get_nowait()
+        except queue.Empty:
+            with self.lock:
+                may_open = self.opened < self.pool_size
+                self.opened += may_open
+            if may_open:
+                connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
+            else:
+                connection = self.pool.get()
+        try:
+            yield connection
+        finally:
+            self.pool.put(connection)
+
+    def teams(self):
+        with self.connection() as connection:
+            return [team for team, in connection.execute("SELECT DISTINCT team FROM players ORDER BY team")]
+
+    def read(self, teams, since=None):
+        """
+        Returns (key, updated, team, name, *SOURCE_COLUMNS values) records of the given teams' players, or of
+        everyone when teams is None, only those stamped after since when it is given. The key is the rowid.
+        """
+        conditions, parameters = [], []
+        if teams is not None:
+            parameters += teams
+            conditions.append(f"team IN ({', '.join('?' * len(teams))})")
+        if since is not None:
+            parameters.append(since)
+            conditions.append("updated > ?")
+        query = f"SELECT rowid, updated, team, name, {', '.join(SOURCE_COLUMNS)} FROM players"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        with self.connection() as connection:
+            return connection.execute(query + " ORDER BY rowid", parameters).fetchall()
+
+    def close(self):
+        with self.lock:
+            while not self.pool.empty():
+                self.pool.get_nowait().close()
+                self.opened -= 1
+
+
+def write_roster_database(path, teams):
+    """
+    Writes {team name: Team} to a SQLite roster database that SqliteRosterSource reads.
+    Bump a row's updated stamp whenever it is edited so that RosterLoader.refresh() picks it up.
+    """
+    columns = ", ".join(f"{source} REAL" for source in SOURCE_COLUMNS)
+    with sqlite3.connect(path) as connection:
+        connection.execute(f"CREATE TABLE IF NOT EXISTS players (team TEXT, name TEXT, {columns}, "
+                           "updated INTEGER DEFAULT 0)")
+        connection.execute("CREATE INDEX IF NOT EXISTS players_team ON players (team, updated)")
+        connection.executemany(
+            f"INSERT INTO players (team, name, {', '.join(SOURCE_COLUMNS)}) "
+            f"VALUES (?, ?, {', '.join('?' * len(SOURCE_COLUMNS))})",
+            [(team_name, player.name, *(getattr(player, name) for name in SOURCE_COLUMNS.values()))
+             for team_name, team in teams.items() for player in team.players])
+    connection.close()
+
+
+class RosterLoader:
+    def __init__(self, source, store=None):
+        """
+        Builds Team objects from a CsvRosterSource or SqliteRosterSource without any per-player source objects:
+        a team's rows are read in one query and appended to the RosterStore column by column, the first time
+        the team is asked for. refresh() then re-reads only what changed and updates those rows in place.
+        Safe to use from several threads; they share the source's pooled connections.
+        """
+        self.source = source
+        self.store = store or RosterStore()
+        self.players = {}  # Source key -> Player
+        self.team_of = {}  # Source key -> team name
+        self.teams = {}  # Team name -> Team, for the teams loaded so far
+        self.version = 0  # Highest updated stamp refresh() has read; lazy team loads leave it alone
+        self.lock = threading.Lock()
+
+    def team_names(self):
+        return self.source.teams()
+
+    def team(self, name):
+        """
+        Returns the named Team, loading its players on first use.
+        """
+        team = self.teams.get(name)
+        while team is None:
+            version = self.version
+            records = self.source.read([name])
+            with self.lock:
+                team = self.teams.get(name)
+                # A refresh that finished since the read skipped this team's changes, so read it again
+                if team is None and self.version == version:
+                    self._apply(records)
+                    team = self.teams[name] = Team([self.players[record[0]] for record in records])
+        return team
+
+    def _members(self, name):
+        # Only needed when players move between teams, so a scan is fine
+        return [player for key, player in self.players.items() if self.team_of[key] == name]
+
+    def _apply(self, records):
+        """
+        Writes source records into the store: new players are appended in bulk, known ones are overwritten
+        where anything differs. Returns (players changed or added, names of the teams they touch).
+        """
+        if not records:
+            return 0, set()
+        keys, _, teams, names, *values = zip(*records)
+        values = np.array(values, dtype=float)  # (len(SOURCE_COLUMNS), len(records))
+        touched = set()
+
+        known = [index for index, key in enumerate(keys) if key in self.players]
+        changed = []
+        if known:
+            rows = np.array([self.players[keys[index]].row for index in known])
+            current = np.array([self.store.columns[name][rows] for name in SOURCE_COLUMNS.values()], dtype=float)
+            differs = (current != values[:, known]).any(axis=0)
+            for index, different in zip(known, differs):
+                key = keys[index]
+                if different or self.team_of[key] != teams[index] or self.players[key].name != names[index]:
+                    changed.append(index)
+            if changed:
+                rows = np.array([self.players[keys[index]].row for index in changed])
+                self.store.update_rows(rows, dict(zip(SOURCE_COLUMNS, values[:, changed])))
+                for index in changed:
+                    key = keys[index]
+                    touched.update((self.team_of[key], teams[index]))
+                    self.team_of[key] = teams[index]
+                    self.players[key].name = names[index]
+
+        new = [index for index, key in enumerate(keys) if key not in self.players]
+        if new:
+            rows = self.store.add_many([names[index] for index in new], dict(zip(SOURCE_COLUMNS, values[:, new])))
+            for index, row in zip(new, rows.tolist()):
+                self.players[keys[index]] = Player.from_row(self.store, row)
+                self.team_of[keys[index]] = teams[index]
+                touched.add(teams[index])
+
+        return len(changed) + len(new), touched
+
+    def refresh(self):
+        """
+        Applies source changes to the loaded teams between simulation batches and returns how many players
+        changed. Teams whose players changed get their rosters rebuilt, which also drops their cached ratings.
+        """
+        if not self.teams:
+            return 0
+        # Every team's changes are read, so that players moving out of a loaded team are seen too
+        records = self.source.read(None, since=self.version)
+        with self.lock:
+            if records:
+                # Unloaded teams' records are dropped below but are read in full whenever those teams load
+                self.version = max(self.version, max(record[1] for record in records))
+            records = [record for record in records if record[0] in self.players or record[2] in self.teams]
+            count, touched = self._apply(records)
+            for name in touched:
+                team = self.teams.get(name)
+                if team is not None:
+                    team.players = self._members(name)
+        return count
+
+    def close(self):
+        self.source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,223 @@
+import weakref
+
+import numpy as np
+
+from columns import flat_rows
+
+# Column name -> dtype for every per-player value kept in a RosterStore
+PLAYER_COLUMNS = {
+    "experience": np.float64,
+    "powerInGoal": np.float64,
+    "powerInDefense": np.float64,
+    "powerInMidfield": np.float64,
+    "powerInOffense": np.float64,
+    "powerInAccuracy": np.float64,
+    "energy": np.float64,
+    "positionId": np.int64,
+    "id": np.int64,
+    "injured": np.bool_,
+    "banned": np.int32,
+    "injury_chance": np.float64,
+}
+# Data source attribute (as on mocks.MockDataSource) -> RosterStore column, the mapping RosterStore.add applies
+SOURCE_COLUMNS = {
+    "experience": "experience",
+    "powerInGoal": "powerInGoal",
+    "powerInDefense": "powerInDefense",
+    "powerInMidfield": "powerInMidfield",
+    "powerInAttack": "powerInOffense",
+    "powerInAccuracy": "powerInAccuracy",
+    "actualEnergy": "energy",
+    "positionId": "positionId",
+    "id": "id",
+    "banned": "banned",
+}
+INJURY_CHANCE = 0.01  # Chance of getting injured during a play, the same for every loaded player
+STAT_FIELDS = ("yellow_card", "red_card", "goals", "assists", "shots_on", "shots_off", "fouls", "plus", "passes",
+               "turnovers")
+
+
+class RosterStore:
+    def __init__(self, capacity=64):
+        """
+        Struct-of-arrays storage for players: one typed NumPy column per attribute and one
+        (rows, len(STAT_FIELDS)) counter block. Player and StatsPlayer objects are views over a row, and they
+        register() with the store: a row nothing views any more is freed for the next player to reuse, and is
+        left out when the store is pickled.
+        """
+        self.size = 0  # Rows in use or freed; the store never shrinks
+        self.names = []
+        self.columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in PLAYER_COLUMNS.items()}
+        self.stats = np.zeros((capacity, len(STAT_FIELDS)), dtype=np.int32)
+        self.viewers = []  # Live views per row
+        self.free = []  # Rows without views, handed out again before the store grows
+        self._watched = {}  # Weak reference to a view -> its row
+        self.column_rows = {}
+        self._refresh_rows()
+
+    def _refresh_rows(self):
+        # Updated in place, since every Player view holds on to column_rows
+        self.column_rows.update(flat_rows(self.columns))
+        self.stat_rows = memoryview(self.stats.reshape(-1))
+
+    def register(self, view):
+        """
+        Counts view as a user of its row until the view is garbage collected.
+        """
+        self.viewers[view._row] += 1
+        self._watched[weakref.ref(view, self._release)] = view._row
+
+    def _release(self, reference):
+        # Called by the garbage collector, at any point, so it only ever appends to free
+        row = self._watched.pop(reference)
+        self.viewers[row] -= 1
+        if not self.viewers[row]:
+            self.free.append(row)
+
+    def _reuse(self, row, name):
+        for column in self.columns.values():
+            column[row] = 0
+        self.stats[row] = 0
+        self.names[row] = name
+
+    _default = None
+
+    @classmethod
+    def default(cls):
+        """
+        Returns the process-wide store used by players created without an explicit store.
+        """
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
+
+    @property
+    def capacity(self):
+        return len(self.stats)
+
+    def _grow(self, minimum=0):
+        capacity = max(1, self.capacity * 2)
+        while capacity < minimum:
+            capacity *= 2
+        for name, column in self.columns.items():
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            self.columns[name] = grown
+        stats = np.zeros((capacity, len(STAT_FIELDS)), dtype=self.stats.dtype)
+        stats[:self.size] = self.stats[:self.size]
+        self.stats = stats
+        self._refresh_rows()
+
+    def allocate(self, name=""):
+        """
+        Returns the index of an empty row: a freed one if there is any, else a new one at the end.
+        """
+        if self.free:
+            row = self.free.pop()
+            self._reuse(row, name)
+            return row
+        if self.size == self.capacity:
+            self._grow()
+        row = self.size
+        self.size += 1
+        self.names.append(name)
+        self.viewers.append(0)
+        return row
+
+    def add(self, source):
+        """
+        Copies one player from a data source shaped like mocks.MockDataSource and returns its row.
+        """
+        row = self.allocate(source.name)
+        columns = self.columns
+        columns["experience"][row] = source.experience
+        columns["powerInGoal"][row] = source.powerInGoal
+        columns["powerInDefense"][row] = source.powerInDefense
+        columns["powerInMidfield"][row] = source.powerInMidfield
+        columns["powerInOffense"][row] = source.powerInAttack
+        columns["powerInAccuracy"][row] = source.powerInAccuracy
+        columns["energy"][row] = source.actualEnergy
+        columns["positionId"][row] = source.positionId
+        columns["id"][row] = source.id
+        columns["banned"][row] = source.banned or 0
+        columns["injury_chance"][row] = INJURY_CHANCE
+        return row
+
+    def add_many(self, names, values):
+        """
+        Adds len(names) players at once from columnar data: values maps each SOURCE_COLUMNS attribute to
+        an array-like with one entry per player. Freed rows are filled first. Returns the players' rows.
+        """
+        reused = [self.free.pop() for _ in range(min(len(names), len(self.free)))]
+        for row, name in zip(reused, names):
+            self._reuse(row, name)
+        start, count = self.size, len(names) - len(reused)
+        if start + count > self.capacity:
+            self._grow(start + count)
+        rows = np.concatenate([np.array(reused, dtype=np.intp), np.arange(start, start + count)])
+        self.update_rows(rows, values)
+        self.columns["injury_chance"][rows] = INJURY_CHANCE
+        self.names.extend(names[len(reused):])
+        self.viewers.extend([0] * count)
+        self.size += count
+        return rows
+
+    def update_rows(self, rows, values):
+        """
+        Overwrites the SOURCE_COLUMNS attributes of existing rows from columnar data, as add_many reads it.
+        """
+        for source, name in SOURCE_COLUMNS.items():
+            self.columns[name][rows] = values[source]
+
+    def column(self, name, rows=None):
+        """
+        Returns the live column for an attribute, optionally gathered at the given rows.
+        """
+        column = self.columns[name][:self.size]
+        return column if rows is None else column[rows]
+
+    def credit(self, rows, counts):
+        """
+        Adds counts to the stats of the given rows in one call; counts holds len(STAT_FIELDS) values per row,
+        back to back, and repeated rows accumulate.
+        """
+        np.add.at(self.stats, rows, np.array(counts, dtype=self.stats.dtype).reshape(len(rows), -1))
+
+    def __len__(self):
+        return self.size
+
+    def __getstate__(self):
+        # Only rows that are still viewed travel to worker processes, renumbered from 0 in order. Views pickled
+        # along are rebuilt over their new row through moved (see classes._unpickle_view)
+        rows = np.array([row for row, viewers in enumerate(self.viewers) if viewers], dtype=np.intp)
+        return {
+            "size": len(rows),
+            "names": [self.names[row] for row in rows.tolist()],
+            "columns": {name: column[rows] for name, column in self.columns.items()},
+            "stats": self.stats[rows],
+            "moved": rows,
+        }
+
+    def __setstate__(self, state):
+        moved = state.pop("moved")
+        self.__dict__.update(state)
+        self.moved = dict(zip(moved.tolist(), range(len(moved))))  # Row in the pickled store -> row here
+        self.viewers = [0] * self.size
+        self.free = []
+        self._watched = {}
+        self.column_rows = {}
+        self._refresh_rows()
+
+
+class StatColumn:
+    def __init__(self, index):
+        self.index = index
+        self.width = len(STAT_FIELDS)
+
+    def __get__(self, view, owner=None):
+        if view is None:
+            return self
+        return view._store.stat_rows[view._row * self.width + self.index]
+
+    def __set__(self, view, value):
+        view._store.stats[view._row, self.index] = value
@@ -0,0 +1,112 @@
+import math
+
+CELL_SIZE = 50  # Matches the widest contact distance, so pair queries only look at neighbouring cells
+BRUTE_FORCE_LIMIT = 8  # Below this many objects comparing every pair is cheaper than walking cells
+SEGMENT_CELL_COST = 3  # Walking one cell along a segment costs about as much as testing this many objects
+
+
+class SpatialHash:
+    def __init__(self, cell_size=CELL_SIZE):
+        """
+        Uniform grid over objects with x and y attributes. Cells map to the list indices of the objects
+        they contain, so every query answers with indices into the list passed to rebuild().
+        """
+        self.cell_size = cell_size
+        self.items = []
+        self.cells = {}
+        self._offsets = {}
+
+    def cell_of(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def rebuild(self, items):
+        """
+        Re-buckets every object from scratch and returns self.
+        """
+        self.items = items
+        self.cells = {}
+        for index, item in enumerate(items):
+            self.cells.setdefault(self.cell_of(item.x, item.y), []).append(index)
+        return self
+
+    def query(self, x, y, radius):
+        """
+        Returns the sorted indices of objects closer than radius to (x, y).
+        """
+        first_x, first_y = self.cell_of(x - radius, y - radius)
+        last_x, last_y = self.cell_of(x + radius, y + radius)
+        limit = radius * radius
+        found = []
+        for cell_x in range(first_x, last_x + 1):
+            for cell_y in range(first_y, last_y + 1):
+                for index in self.cells.get((cell_x, cell_y), ()):
+                    item = self.items[index]
+                    if (item.x - x) ** 2 + (item.y - y) ** 2 < limit:
+                        found.append(index)
+        found.sort()
+        return found
+
+    def pairs(self, radius):
+        """
+        Returns sorted (i, j) index pairs, i < j, of objects closer than radius to each other.
+        Each occupied cell is only compared with itself and half of its neighbourhood, so every pair is seen once.
+        """
+        limit = radius * radius
+        items = self.items
+        found = []
+
+        def close(i, j):
+            return (items[i].x - items[j].x) ** 2 + (items[i].y - items[j].y) ** 2 < limit
+
+        if len(items) < BRUTE_FORCE_LIMIT:
+            return [(i, j) for i in range(len(items)) for j in range(i + 1, len(items)) if close(i, j)]
+
+        offsets = self._offsets.get(radius)
+        if offsets is None:
+            reach = int(math.ceil(radius / self.cell_size))
+            offsets = self._offsets[radius] = [(dx, dy) for dx in range(-reach, reach + 1)
+                                               for dy in range(-reach, reach + 1) if (dx, dy) > (0, 0)]
+        for (cell_x, cell_y), bucket in self.cells.items():
+            for a in range(len(bucket)):
+                for b in range(a + 1, len(bucket)):
+                    if close(bucket[a], bucket[b]):
+                        found.append((min(bucket[a], bucket[b]), max(bucket[a], bucket[b])))
+            for dx, dy in offsets:
+                neighbour = self.cells.get((cell_x + dx, cell_y + dy))
+                if not neighbour:
+                    continue
+                for i in bucket:
+                    for j in neighbour:
+                        if close(i, j):
+                            found.append((min(i, j), max(i, j)))
+        found.sort()
+        return found
+
+    def query_segment(self, x1, y1, x2, y2, margin=1):
+        """
+        Returns the sorted indices of objects in cells the segment passes through, widened by margin.
+        These are candidates only; callers still run their exact test on them.
+        """
+        size = self.cell_size
+        if SEGMENT_CELL_COST * ((abs(x2 - x1) + abs(y2 - y1) + 2 * margin) / size + 2) >= len(self.items):
+            # Walking the cells would cost more than handing back every object
+            return list(range(len(self.items)))
+        cells = self.cells
+        low_x, high_x = min(x1, x2), max(x1, x2)
+        slope = (y2 - y1) / (x2 - x1) if x1 != x2 else None
+        found = []
+        for cell_x in range(int((low_x - margin) // size), int((high_x + margin) // size) + 1):
+            if slope is None:
+                low, high = min(y1, y2), max(y1, y2)
+            else:
+                # y-range of the segment inside this column, clamped to the segment's ends
+                start = min(max(cell_x * size, low_x), high_x)
+                end = min(max((cell_x + 1) * size, low_x), high_x)
+                low, high = y1 + (start - x1) * slope, y1 + (end - x1) * slope
+                if low > high:
+                    low, high = high, low
+            for cell_y in range(int((low - margin) // size), int((high + margin) // size) + 1):
+                bucket = cells.get((cell_x, cell_y))
+                if bucket:
+                    found.extend(bucket)
+        return sorted(set(found))
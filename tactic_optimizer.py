@@ -0,0 +1,200 @@
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+from batch_engine import BatchMatchEngine
+from classes import Match, Tactics
+from physics import FRAME_TIME
+from tournament import fixture_profiles, simulate_profiles
+
+ROUND_SIZE = 2_000  # Matches per pairing per round; each round is one paired sample for the significance tests
+MAX_ROUNDS = 20
+MIN_ROUNDS = 5  # Rounds played before anything is pruned, so the variance estimates mean something
+ALPHA = 0.05  # Significance level of the pruning tests and of significant()
+
+
+def _payoff(home_goals, away_goals):
+    """
+    Home points minus away points per match: 3, 0 or -3. Zero-sum, so the away side minimizes it.
+    """
+    return 3 * np.sign(home_goals.astype(np.int64) - away_goals)
+
+
+def minute_engine_payoffs(home_team, away_team, home_tactic, away_tactic, n, seed_sequence):
+    """
+    Payoff of n matches on the vectorized minute engine. Its pass and shot odds do not depend on ratings, so
+    tactics make no difference there and optimize_tactics stops after min_rounds with every tactic kept.
+    """
+    match = Match(home_team, away_team, home_tactic, away_tactic, record_events=False)
+    batch = BatchMatchEngine(match, seed=seed_sequence).simulate(n)
+    return _payoff(batch.home_goals, batch.away_goals)
+
+
+def physics_payoffs(home_team, away_team, home_tactic, away_tactic, n, seed_sequence, duration=60):
+    """
+    Payoff of n matches of duration simulated seconds on the 2D engine, where tactics also change pace.
+    Pass it with functools.partial to choose another duration.
+    """
+    _, home, _, away = fixture_profiles(Match(home_team, away_team, home_tactic, away_tactic, record_events=False))
+    home_goals, away_goals, _ = simulate_profiles([(home, away)] * n, int(round(duration / FRAME_TIME)), seed_sequence)
+    return _payoff(home_goals, away_goals)
+
+
+def _paired_z(differences):
+    """
+    z statistic of the mean of per-round paired differences; 0 when they are all zero.
+    """
+    rounds = len(differences)
+    mean = float(np.mean(differences))
+    spread = float(np.std(differences, ddof=1)) if rounds > 1 else 0.0
+    if spread == 0:
+        return 0.0 if mean == 0 else math.copysign(math.inf, mean)
+    return mean / (spread / math.sqrt(rounds))
+
+
+class TacticPayoffs:
+    def __init__(self, home_tactics, away_tactics, away_weights, round_means, played, pruned_home, pruned_away,
+                 alpha=ALPHA):
+        """
+        Outcome of a tactic search. round_means[r, h, a] is the mean payoff (home points minus away points)
+        of pairing (h, a) in round r, nan once one of its tactics was pruned; played[h, a] counts its rounds.
+        Every pairing in a round used the same random draws, so differences between cells are paired samples.
+        pruned_home and pruned_away map each pruned tactic to the number of rounds it was played.
+        """
+        self.home_tactics = list(home_tactics)
+        self.away_tactics = list(away_tactics)
+        self.away_weights = away_weights
+        self.round_means = round_means
+        self.played = played
+        self.pruned_home = pruned_home
+        self.pruned_away = pruned_away
+        self.alpha = alpha
+
+    @property
+    def matrix(self):
+        """
+        (home tactics, away tactics) array of mean payoffs over the rounds each pairing was played.
+        """
+        return np.nansum(self.round_means, axis=0) / self.played
+
+    def standard_errors(self):
+        """
+        Standard error of every matrix entry; nan for pairings played fewer than two rounds.
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.nanstd(self.round_means, axis=0, ddof=1) / np.sqrt(self.played)
+
+    def _series(self, home_tactic, away_tactic):
+        h = self.home_tactics.index(home_tactic)
+        if away_tactic is None:
+            return self.round_means[:, h, :] @ self.away_weights
+        return self.round_means[:, h, self.away_tactics.index(away_tactic)]
+
+    def significance(self, home_tactic, other_home_tactic, away_tactic=None):
+        """
+        (mean difference, p-value) of home_tactic over other_home_tactic against away_tactic, or against the
+        opponent distribution when none is given. Two-sided paired z test over the rounds both were played.
+        """
+        differences = self._series(home_tactic, away_tactic) - self._series(other_home_tactic, away_tactic)
+        differences = differences[~np.isnan(differences)]
+        z = _paired_z(differences)
+        return float(np.mean(differences)), 2 * (1 - NormalDist().cdf(abs(z)))
+
+    def significant(self, home_tactic, other_home_tactic, away_tactic=None):
+        return self.significance(home_tactic, other_home_tactic, away_tactic)[1] < self.alpha
+
+    def best_response(self, away_tactic=None):
+        """
+        Home tactic with the highest mean payoff against away_tactic, or against the opponent distribution.
+        """
+        if away_tactic is None:
+            scores = self.matrix @ self.away_weights
+        else:
+            scores = self.matrix[:, self.away_tactics.index(away_tactic)]
+        return self.home_tactics[int(np.nanargmax(scores))]
+
+    def away_best_response(self, home_tactic):
+        """
+        Away tactic with the lowest mean payoff against home_tactic.
+        """
+        return self.away_tactics[int(np.nanargmin(self.matrix[self.home_tactics.index(home_tactic)]))]
+
+
+def optimize_tactics(home_team, away_team, home_tactics=None, away_tactics=None, away_weights=None,
+                     round_size=ROUND_SIZE, max_rounds=MAX_ROUNDS, min_rounds=MIN_ROUNDS, alpha=ALPHA, seed=None,
+                     simulate=minute_engine_payoffs):
+    """
+    Plays every home/away tactic pairing round by round with common random numbers: within a round every
+    pairing gets the same child of one SeedSequence, so the differences between tactics are not drowned
+    in sampling noise and far fewer matches are needed to tell them apart.
+    From min_rounds on, a tactic is pruned once another is significantly better (paired z test at alpha,
+    Bonferroni-corrected over the comparisons) against every opponent tactic still in play; with away_weights
+    (a distribution over away_tactics) home tactics are compared on the weighted mix and away tactics are kept.
+    Stops once each side is down to one tactic, when no pairing plays differently from another, or after
+    max_rounds. Returns TacticPayoffs.
+    simulate(home_team, away_team, home_tactic, away_tactic, n, seed_sequence) returns per-match payoffs;
+    use physics_payoffs to search on the 2D engine.
+    """
+    home_tactics = list(home_tactics or Tactics.TACTIC_EFFECTS)
+    away_tactics = list(away_tactics or Tactics.TACTIC_EFFECTS)
+    fixed_opponents = away_weights is not None
+    if fixed_opponents:
+        away_weights = np.asarray(away_weights, dtype=float) / np.sum(away_weights)
+    else:
+        away_weights = np.full(len(away_tactics), 1 / len(away_tactics))
+    round_means = np.full((max_rounds, len(home_tactics), len(away_tactics)), np.nan)
+    played = np.zeros((len(home_tactics), len(away_tactics)), dtype=np.int64)
+    home_alive = np.ones(len(home_tactics), dtype=bool)
+    away_alive = np.ones(len(away_tactics), dtype=bool)
+    pruned_home, pruned_away = {}, {}
+    comparisons = len(home_tactics) * (len(home_tactics) - 1) + len(away_tactics) * (len(away_tactics) - 1)
+    critical = NormalDist().inv_cdf(1 - alpha / max(comparisons, 1))
+
+    for number, seed_sequence in enumerate(np.random.SeedSequence(seed).spawn(max_rounds)):
+        for h in np.flatnonzero(home_alive):
+            for a in np.flatnonzero(away_alive):
+                payoffs = simulate(home_team, away_team, home_tactics[h], away_tactics[a], round_size, seed_sequence)
+                round_means[number, h, a] = np.mean(payoffs)
+                played[h, a] += 1
+        rounds = number + 1
+        if rounds < min_rounds:
+            continue
+
+        means = round_means[:rounds]
+        rows, columns = np.flatnonzero(home_alive), np.flatnonzero(away_alive)
+        live = means[:, rows][:, :, columns]
+        if (live == live[:, :1, :1]).all():
+            break  # The same draws gave the same results everywhere: these tactics make no difference to the engine
+        dominated_home = set()
+        for h2 in rows:
+            for h1 in rows:
+                if h1 == h2 or h1 in dominated_home:
+                    continue
+                if fixed_opponents:
+                    tests = [(means[:, h1, columns] - means[:, h2, columns]) @ away_weights[columns]]
+                else:
+                    tests = [means[:, h1, a] - means[:, h2, a] for a in columns]
+                if all(_paired_z(differences) > critical for differences in tests):
+                    dominated_home.add(h2)
+                    break
+        dominated_away = set()
+        if not fixed_opponents:
+            for a2 in columns:
+                for a1 in columns:
+                    if a1 == a2 or a1 in dominated_away:
+                        continue
+                    # The away side wants the payoff low
+                    if all(_paired_z(means[:, h, a2] - means[:, h, a1]) > critical for h in rows):
+                        dominated_away.add(a2)
+                        break
+        for h in dominated_home:
+            home_alive[h] = False
+            pruned_home[home_tactics[h]] = rounds
+        for a in dominated_away:
+            away_alive[a] = False
+            pruned_away[away_tactics[a]] = rounds
+        if home_alive.sum() == 1 and (fixed_opponents or away_alive.sum() == 1):
+            break
+    return TacticPayoffs(home_tactics, away_tactics, away_weights, round_means[:rounds], played, pruned_home,
+                         pruned_away, alpha)
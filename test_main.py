@@ -0,0 +1,856 @@
+"""
+Benchmark and behavior suite for the simulation and physics hot paths. Everything runs headless.
+
+Run with ``python -m pytest -q test_main.py``. Besides the benchmarks, tests assert what the optimized paths
+must keep doing: the minute engines agree with the exact distribution, schedules and tables follow the rules,
+and rosters, stats and caches behave as documented.
+
+Every benchmark records its throughput in operations per second into BENCHMARK_OUTPUT (JSON). When
+BENCHMARK_BASELINE exists, each result is compared against it and the test fails if throughput dropped by more
+than the allowed fraction: the entry's own "threshold", or BENCHMARK_THRESHOLD for entries without one. Set
+BENCHMARK_UPDATE_BASELINE=1 to write the current results as the new baseline instead.
+Throughput depends on the machine, so no baseline is committed: write one on the machine the comparisons will
+run on. Until one exists the benchmarks only record their results and never fail.
+"""
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+
+import pytest
+
+import physics
+from classes import HOME, Match, Player, Team
+from mocks import MockDataSource
+
+BASELINE_PATH = os.environ.get("BENCHMARK_BASELINE", "benchmark_baseline.json")
+OUTPUT_PATH = os.environ.get("BENCHMARK_OUTPUT", "benchmark_results.json")
+DEFAULT_THRESHOLD = float(os.environ.get("BENCHMARK_THRESHOLD", "0.25"))
+UPDATE_BASELINE = os.environ.get("BENCHMARK_UPDATE_BASELINE") == "1"
+MIN_TIME = float(os.environ.get("BENCHMARK_MIN_TIME", "0.2"))  # Seconds spent timing each benchmark
+
+PLAYER_COUNTS = [2, 22]
+CONCURRENT_PITCHES = 8
+WORLD_PITCHES = 256
+CORE_MODULES = ["classes", "batch_engine", "monte_carlo", "league", "physics", "tournament", "trajectory"]
+GUI_MODULES = ["pygame", "cv2", "pygame_screen_record"]  # Only rendering and recording may load these
+
+results = {}
+
+
+def measure(operation, ops_per_call=1, min_time=MIN_TIME):
+    """
+    Calls operation repeatedly for at least min_time seconds after one warm-up call and
+    returns the best observed throughput in operations per second.
+    """
+    operation()
+    best = 0.0
+    deadline = time.perf_counter() + min_time
+    while True:
+        start = time.perf_counter()
+        operation()
+        elapsed = time.perf_counter() - start
+        best = max(best, ops_per_call / max(elapsed, 1e-9))
+        if time.perf_counter() >= deadline:
+            return best
+
+
+def load_baseline():
+    if not os.path.exists(BASELINE_PATH):
+        return {}
+    with open(BASELINE_PATH) as baseline_file:
+        return json.load(baseline_file)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def benchmark_report():
+    yield
+    with open(OUTPUT_PATH, "w") as output_file:
+        json.dump(results, output_file, indent=2, sort_keys=True)
+    if UPDATE_BASELINE:
+        baseline = load_baseline()
+        for name, entry in results.items():
+            baseline.setdefault(name, {})["ops_per_second"] = entry["ops_per_second"]
+        with open(BASELINE_PATH, "w") as baseline_file:
+            json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+
+
+def record(name, ops_per_second, unit):
+    """
+    Stores a result and fails if it regressed beyond the baseline's threshold.
+    """
+    results[name] = {"ops_per_second": ops_per_second, "unit": unit}
+    expected = load_baseline().get(name)
+    if UPDATE_BASELINE or not expected:
+        return
+    threshold = expected.get("threshold", DEFAULT_THRESHOLD)
+    floor = expected["ops_per_second"] * (1 - threshold)
+    assert ops_per_second >= floor, (
+        f"{name}: {ops_per_second:.1f} {unit}/s is below {floor:.1f} "
+        f"({threshold:.0%} under the baseline of {expected['ops_per_second']:.1f})")
+
+
+def make_team(prefix, size=11):
+    return Team([Player(MockDataSource(f"{prefix}{index}")) for index in range(size)])
+
+
+@pytest.fixture(scope="module")
+def teams():
+    return make_team("Home"), make_team("Away")
+
+
+def test_simulate_match_throughput(teams):
+    home, away = teams
+    record("simulate_match", measure(lambda: Match(home, away).simulate_match()), "matches")
+
+
+def test_simulate_match_without_events_throughput(teams):
+    home, away = teams
+    record("simulate_match_no_events",
+           measure(lambda: Match(home, away, record_events=False).simulate_match()), "matches")
+
+
+@pytest.mark.parametrize("event_driven", [False, True])
+def test_simulate_batch_throughput(teams, event_driven):
+    pytest.importorskip("numpy")
+    home, away = teams
+    n = 20_000
+    ops = measure(lambda: Match(home, away).simulate_batch(n, event_driven=event_driven), ops_per_call=n)
+    record(f"simulate_batch[{'event' if event_driven else 'tick'}]", ops, "matches")
+
+
+def assert_agrees_with_exact(home_goals, away_goals, exact):
+    """
+    Fails unless sampled scores match the exact distribution's expected goals and outcome probabilities
+    within four standard errors.
+    """
+    import numpy as np
+    n = len(home_goals)
+    for goals, mean in zip((home_goals, away_goals), exact.expected_goals()):
+        assert abs(goals.mean() - mean) < 4 * goals.std() / np.sqrt(n)
+    observed = (np.count_nonzero(home_goals > away_goals), np.count_nonzero(home_goals < away_goals),
+                np.count_nonzero(home_goals == away_goals))
+    for count, probability in zip(observed, exact.probabilities().values()):
+        assert abs(count / n - probability) < 4 * np.sqrt(probability * (1 - probability) / n)
+
+
+@pytest.mark.parametrize("engine", ["BatchMatchEngine", "EventDrivenEngine"])
+def test_batch_engine_agrees_with_exact_distribution(teams, engine):
+    pytest.importorskip("numpy")
+    import batch_engine
+    from exact_distribution import exact_outcome_distribution
+    # The vectorized engines play the same minute model as simulate_match, only many matches at once
+    result = getattr(batch_engine, engine)(Match(*teams), seed=0).simulate(20_000)
+    assert_agrees_with_exact(result.home_goals, result.away_goals, exact_outcome_distribution(*teams))
+
+
+def test_exact_distribution_matches_simulated_matches(teams):
+    np = pytest.importorskip("numpy")
+    from exact_distribution import exact_outcome_distribution
+    exact = exact_outcome_distribution(*teams)
+    assert (exact.scorelines >= 0).all() and exact.scorelines.sum() == pytest.approx(1)
+    assert sum(exact.probabilities().values()) == pytest.approx(1)
+    rng = random.Random(0)
+    matches = [Match(*teams, record_events=False, record_stats=False, rng=rng) for _ in range(2_000)]
+    for match in matches:
+        match.simulate_match()
+    assert_agrees_with_exact(np.array([match.home_goals for match in matches]),
+                             np.array([match.away_goals for match in matches]), exact)
+
+
+def test_exact_distribution_leaves_teams_alone(teams):
+    pytest.importorskip("numpy")
+    from exact_distribution import exact_outcome_distribution
+    home, away = teams
+    home.reset_active_players()
+    home.remove_from_play(home.players[3])
+    active = list(home.get_active_players())
+    exact_outcome_distribution(home, away)
+    assert home.get_active_players() == active
+
+
+@pytest.mark.parametrize("n_teams", [4, 5])
+def test_round_robin_schedule(n_teams):
+    league = pytest.importorskip("league")
+    rounds = league.round_robin(n_teams)
+    assert len(rounds) == 2 * (n_teams - 1 + n_teams % 2)
+    for fixtures in rounds:
+        playing = [team for fixture in fixtures for team in fixture]
+        assert len(playing) == len(set(playing)) == n_teams - n_teams % 2
+    fixtures = sorted(fixture for fixtures in rounds for fixture in fixtures)
+    assert fixtures == sorted((home, away) for home in range(n_teams) for away in range(n_teams) if home != away)
+    homes = [sum(home == team for home, _ in fixtures) for team in range(n_teams)]
+    assert homes == [n_teams - 1] * n_teams
+
+
+def test_standings():
+    np = pytest.importorskip("numpy")
+    league = pytest.importorskip("league")
+    standings = league.Standings(3)
+    standings.record(0, 1, 2, 0)
+    standings.record(1, 2, 1, 1)
+    standings.record(2, 0, 3, 1)
+    # 0 and 2 are level on points and goal difference; 2 beat 0 head to head
+    assert [row["team"] for row in standings.table(["A", "B", "C"])] == ["C", "A", "B"]
+    first, second, third = standings.table()
+    assert (first["points"], first["won"], first["drawn"], first["goals_for"], first["goal_difference"]) == \
+        (4, 1, 1, 4, 2)
+    assert (second["points"], second["lost"], second["goal_difference"]) == (3, 1, 0)
+    assert (third["played"], third["points"], third["goals_against"]) == (2, 1, 3)
+
+    # Results recorded as arrays keep one independent table per season
+    seasons = league.Standings(2, seasons=2)
+    seasons.record(0, 1, np.array([1, 0]), np.array([0, 2]))
+    assert seasons.ranking().tolist() == [[0, 1], [1, 0]]
+
+
+def test_get_active_players(teams):
+    home, _ = teams
+    calls = 10_000
+
+    def operation():
+        for _ in range(calls):
+            home.get_active_players()
+
+    record("get_active_players", measure(operation, ops_per_call=calls), "calls")
+
+
+def test_active_player_index():
+    team = make_team("Index", 4)
+    first, second, third, fourth = team.players
+    second.injured = True
+    team.reset_active_players()
+    assert team.get_active_players() == [first, third, fourth]
+    team.remove_from_play(first)
+    assert sorted(team.get_active_players(), key=team.roster_position) == [third, fourth]
+    assert team.starters() == [first, third, fourth]
+    team.remove_from_play(fourth)
+    assert team.get_active_players() == [third]
+    team.reset_active_players()
+    assert team.get_active_players() == [first, third, fourth]
+
+    # A banned player never takes part, and dismissals do not carry over into the next match
+    second.injured = False
+    fourth.banned = True
+    team.remove_from_play(first)
+    match = Match(team, make_team("Rival", 4), rng=random.Random(0))
+    match.simulate_match()
+    acting = {event.player for event in match.events if event.team == HOME}
+    assert team.roster_position(fourth) not in acting and team.roster_position(first) in acting
+
+
+def make_pitch(n_players, world=None, match=0):
+    """
+    Lays out n_players in two teams on a grid that keeps everyone apart at kick-off.
+    With a world, the players and ball are views over pitch `match` of it.
+    """
+    width, height = physics.WIDTH, physics.HEIGHT
+    engine = physics.kickoff(width, height)
+    home_goal, away_goal = engine.home_goal, engine.away_goal
+    players = []
+    for index in range(n_players):
+        home_side = index % 2 == 0
+        column, row = divmod(index // 2, 4)
+        x = width // 2 - (1 if home_side else -1) * (60 + 60 * column)
+        y = height // 5 * (row + 1)
+        players.append(physics.Player(
+            f"P{index}", x, y, physics.BLUE if home_side else physics.RED,
+            goal_home=home_goal if home_side else away_goal, goal_away=away_goal if home_side else home_goal,
+            rotation=0 if home_side else 180,
+            world=world, index=None if world is None else world.player_index(match, index)))
+    if world is None:
+        return players, engine.ball
+    return players, physics.Ball(width // 2, height // 2, world=world, index=match)
+
+
+@pytest.mark.parametrize("n_players", PLAYER_COUNTS)
+def test_check_and_resolve_collisions(n_players):
+    players, ball = make_pitch(n_players)
+    record(f"check_and_resolve_collisions[{n_players}]",
+           measure(lambda: physics.check_and_resolve_collisions(players, ball)), "frames")
+
+
+@pytest.mark.parametrize("n_players", PLAYER_COUNTS)
+def test_engine_decide(n_players):
+    engine = physics.PhysicsEngine(*make_pitch(n_players))
+    record(f"engine_decide[{n_players}]", measure(engine.decide), "frames")
+
+
+def test_lane_queries():
+    np = pytest.importorskip("numpy")
+    from lane_queries import LaneQueries, distance_to_segment, segment_distances
+    # Beyond its ends a segment is measured to the nearer end, not to the infinite line through it
+    assert distance_to_segment(0, 0, 10, 0, 15, 0) == 5 and physics.point_on_line(0, 0, 10, 0, 15, 0)
+    assert distance_to_segment(0, 0, 10, 0, 5, 3) == 3
+    assert distance_to_segment(2, 2, 2, 2, 5, 6) == 5
+    rng = random.Random(0)
+    coordinates = [[rng.uniform(0, 100) for _ in range(30)] for _ in range(6)]
+    coordinates[2][:3], coordinates[3][:3] = coordinates[0][:3], coordinates[1][:3]  # Zero-length segments
+    assert np.allclose(segment_distances(*map(np.array, coordinates)),
+                       [distance_to_segment(*values) for values in zip(*coordinates)])
+
+    engine = physics.kickoff()
+    home_goal, away_goal = engine.home_goal, engine.away_goal
+    goal_y = away_goal.y + away_goal.height // 2
+
+    def player(name, x, y, color=physics.BLUE):
+        return physics.Player(name, x, y, color, goal_home=home_goal, goal_away=away_goal)
+
+    shooter = player("Shooter", 400, goal_y)
+    behind = player("Behind", 300, goal_y, physics.RED)  # On the line through the lane, but behind the shooter
+    blocker = player("Blocker", 600, goal_y, physics.RED)
+    opponent = player("Opponent", 430, goal_y + 40, physics.RED)  # Nearest player ahead, but on the other team
+    teammate = player("Teammate", 480, goal_y - 60)
+    far = player("Far", 460, goal_y + 300)
+    back = player("Back", 380, goal_y + 10)
+    players = [shooter, behind, blocker, opponent, teammate, far, back]
+    lanes = LaneQueries(players)
+    assert lanes.shot_obstructions(shooter) == [blocker]
+    assert lanes.shot_clear(blocker) and not lanes.shot_clear(behind)
+    direction = shooter.goal_direction()
+    assert lanes.teammate_in_direction(shooter, direction) is teammate
+    assert shooter.find_teammate_in_direction(direction, players) is teammate
+    assert lanes.teammate_in_direction(teammate, direction) is None  # Nobody of its team ahead of it
+    assert lanes.teammate_in_direction(shooter, (-1, 0)) is back
+    assert lanes.teammate_in_direction(shooter, direction, max_distance=50) is None
+
+
+def test_spatial_hash_matches_brute_force():
+    from types import SimpleNamespace
+    from lane_queries import distance_to_segment
+    from spatial_hash import SpatialHash
+    rng = random.Random(0)
+    points = [SimpleNamespace(x=rng.uniform(-50, 850), y=rng.uniform(-50, 650)) for _ in range(200)]
+    grid = SpatialHash().rebuild(points)
+
+    def close(a, b, radius):
+        return (a.x - b.x) ** 2 + (a.y - b.y) ** 2 < radius * radius
+
+    for radius in (15, 50, 120):
+        assert grid.pairs(radius) == [(i, j) for i in range(len(points)) for j in range(i + 1, len(points))
+                                      if close(points[i], points[j], radius)]
+        for center in points[:20]:
+            assert grid.query(center.x, center.y, radius) == [index for index, point in enumerate(points)
+                                                              if close(point, center, radius)]
+    # Segment queries may return extra candidates but never miss a point near the segment
+    segments = [tuple(rng.uniform(0, 800) for _ in range(4)) for _ in range(50)]
+    segments += [(400, 0, 400, 600), (0, 300, 800, 300)]  # Vertical and horizontal
+    for x1, y1, x2, y2 in segments:
+        candidates = set(grid.query_segment(x1, y1, x2, y2, margin=10))
+        assert {index for index, point in enumerate(points)
+                if distance_to_segment(x1, y1, x2, y2, point.x, point.y) < 10} <= candidates
+
+
+def test_ball_update():
+    _, ball = make_pitch(0)
+    updates = 10_000
+
+    def operation():
+        for _ in range(updates):
+            ball.set_velocity(3, 2)
+            ball.update()
+
+    record("ball_update", measure(operation, ops_per_call=updates), "updates")
+
+
+@pytest.mark.parametrize("n_players", PLAYER_COUNTS)
+def test_physics_engine_step(n_players):
+    players, ball = make_pitch(n_players)
+    engine = physics.PhysicsEngine(players, ball)
+    frames = 100
+    record(f"physics_engine_step[{n_players}]", measure(lambda: engine.run(frames), ops_per_call=frames), "frames")
+
+
+def test_concurrent_pitches():
+    engines = [physics.PhysicsEngine(*make_pitch(22)) for _ in range(CONCURRENT_PITCHES)]
+
+    def operation():
+        for engine in engines:
+            engine.step()
+
+    record(f"concurrent_pitches[{CONCURRENT_PITCHES}x22]",
+           measure(operation, ops_per_call=CONCURRENT_PITCHES), "frames")
+
+
+def test_world_step():
+    world = physics.PhysicsWorld(WORLD_PITCHES, 22)
+    for match in range(WORLD_PITCHES):
+        make_pitch(22, world, match)
+    frames = 10
+    record(f"world_step[{WORLD_PITCHES}x22]", measure(lambda: [world.step() for _ in range(frames)],
+                                                       ops_per_call=WORLD_PITCHES * frames), "frames")
+
+
+def test_render_frame():
+    pytest.importorskip("pygame")
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    match_visualization = pytest.importorskip("match_visualization")
+    players, ball = make_pitch(22)
+    engine = physics.PhysicsEngine(players, ball, players[0].home_goal, players[0].away_goal)
+    renderer = match_visualization.PygameRenderer(match_visualization.open_window(), frame_delay=0)
+
+    def operation():
+        engine.step()
+        renderer(engine)
+
+    record("render_frame[22]", measure(operation), "frames")
+
+
+def test_video_export(tmp_path):
+    pytest.importorskip("cv2")
+    video_export = pytest.importorskip("video_export")
+    players, ball = make_pitch(22)
+    engine = physics.PhysicsEngine(players, ball, players[0].home_goal, players[0].away_goal)
+    frames = 20
+    ops = measure(lambda: video_export.export_video(engine, str(tmp_path / "export.mp4"), frames), ops_per_call=frames)
+    record("video_export[22]", ops, "frames")
+
+
+@pytest.mark.parametrize("show_shooting_range", [True, False])
+def test_video_frames_match_full_redraw(tmp_path, show_shooting_range):
+    cv2 = pytest.importorskip("cv2")
+    pygame = pytest.importorskip("pygame")
+    video_export = pytest.importorskip("video_export")
+    engine = physics.kickoff()  # The ball is contested from the start, so everything moves
+    exporter = video_export.VideoExporter(str(tmp_path / "export.mp4"), frame_skip=2,
+                                          show_shooting_range=show_shooting_range)
+    engine.add_observer(exporter)
+    with exporter:
+        engine.run(59)  # Every other step is drawn, the last one included
+    # Dirty rectangles must cover everything that moved: the last frame equals one painted from scratch
+    fresh = pygame.Surface(exporter.surface.get_size())
+    video_export.PygameRenderer(fresh, show_shooting_range, frame_delay=0,
+                                sprites=exporter.renderer.sprites).draw(engine)
+    assert pygame.image.tobytes(exporter.surface, "RGB") == pygame.image.tobytes(fresh, "RGB")
+    assert exporter.written == 30
+    video = cv2.VideoCapture(str(tmp_path / "export.mp4"))
+    assert int(video.get(cv2.CAP_PROP_FRAME_COUNT)) == 30
+    video.release()
+
+
+def test_trajectory_recording(tmp_path):
+    trajectory = pytest.importorskip("trajectory")
+    players, ball = make_pitch(22)
+    engine = physics.PhysicsEngine(players, ball, players[0].home_goal, players[0].away_goal)
+    frames = 100
+    ops = measure(lambda: trajectory.record_trajectory(engine, str(tmp_path / "match.traj"), frames),
+                  ops_per_call=frames)
+    record("trajectory_recording[22]", ops, "frames")
+
+    replay = trajectory.Replay(str(tmp_path / "match.traj"))
+    record("replay_seek[22]", measure(lambda: [replay.seek(frame) for frame in range(frames)], ops_per_call=frames),
+           "frames")
+
+
+def test_trajectory_round_trip(tmp_path):
+    np = pytest.importorskip("numpy")
+    trajectory = pytest.importorskip("trajectory")
+    engine = physics.kickoff()
+    path = str(tmp_path / "kickoff.traj")
+    states = []
+    engine.add_observer(lambda engine: states.append(
+        ([(player.x, player.y) for player in engine.players], (engine.ball.x, engine.ball.y),
+         engine.players.index(engine.ball.possessed_by) if engine.ball.possessed_by is not None else -1)))
+    with trajectory.TrajectoryRecorder(path, engine, capacity=16) as recorder:
+        engine.add_observer(recorder)
+        engine.run(40)
+        # The header is kept current, so a recording still in progress can already be replayed
+        assert len(trajectory.Replay(path)) == 40
+        engine.run(60)  # Past the initial capacity twice over, so the file has grown
+    replay = trajectory.Replay(path)
+    assert len(replay) == len(states) == 100
+    assert [player.name for player in replay.players] == [player.name for player in engine.players]
+    assert (replay.away_goal.x, replay.away_goal.height) == (engine.away_goal.x, engine.away_goal.height)
+    positions = np.array([state[0] for state in states], dtype=np.float32)
+    assert (replay.frames["x"] == positions[:, :, 0]).all() and (replay.frames["y"] == positions[:, :, 1]).all()
+    assert replay.frames["possessed_by"].tolist() == [state[2] for state in states]
+    for frame in (99, 0, 57):
+        replay.seek(frame)
+        assert [[player.x, player.y] for player in replay.players] == positions[frame].tolist()
+        assert (replay.ball.x, replay.ball.y) == tuple(np.float32(states[frame][1]).tolist())
+        assert replay.frame == frame + 1
+
+
+def test_physics_tournament(teams):
+    tournament = pytest.importorskip("tournament")
+    home, away = teams
+    n, duration = tournament.CHUNK_SIZE, 10
+    fixtures = lambda: [Match(home, away, record_events=False) for _ in range(n)]
+    ops = measure(lambda: list(tournament.simulate_physics_matches(fixtures(), workers=1, seed=0, duration=duration)),
+                  ops_per_call=n * duration)
+    record(f"physics_tournament[{n}x22]", ops, "match seconds")
+
+
+def import_time(modules):
+    """
+    Imports modules in a fresh interpreter and returns the seconds it took and the GUI modules it loaded.
+    """
+    script = (f"import sys, time; start = time.perf_counter(); import {', '.join(modules)}; "
+              f"print(time.perf_counter() - start); print(*sorted(set(sys.modules) & set({GUI_MODULES!r})))")
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)),
+                            env={**os.environ, "SDL_VIDEODRIVER": "dummy"})
+    elapsed, loaded = output.stdout.splitlines()[-2:]
+    return float(elapsed), loaded.split()
+
+
+def test_core_import_time():
+    elapsed, loaded = min(import_time(CORE_MODULES) for _ in range(3))
+    assert not loaded, f"importing the simulation core loaded {loaded}"
+    record("core_import", 1 / elapsed, "imports")
+
+
+def test_visualization_import():
+    elapsed, loaded = min(import_time(["match_visualization", "video_export"]) for _ in range(3))
+    assert "cv2" not in loaded, "cv2 should only load once a video is exported or recorded"
+    record("visualization_import", 1 / elapsed, "imports")
+
+
+def test_result_cache_hit(teams, tmp_path):
+    result_cache = pytest.importorskip("result_cache")
+    home, away = teams
+    with result_cache.ResultCache(str(tmp_path / "results.db")) as cache:
+        cache.simulate_many(home, away, 10_000, workers=1, seed=0)
+        record("result_cache_hit", measure(lambda: cache.simulate_many(home, away, 10_000, workers=1, seed=0)),
+               "queries")
+        assert cache.misses == 1
+
+
+def test_stream_to_precision(teams):
+    monte_carlo = pytest.importorskip("monte_carlo")
+    home, away = teams
+
+    def stream():
+        for result in monte_carlo.stream_many(home, away, precision=0.01, seed=0):
+            pass
+        return result
+
+    n = stream().n
+    record("stream_to_precision[0.01]", measure(stream, ops_per_call=n), "matches")
+
+
+def test_tactic_optimizer(teams):
+    tactic_optimizer = pytest.importorskip("tactic_optimizer")
+    home, away = teams
+    round_size = 500
+    payoffs = tactic_optimizer.optimize_tactics(home, away, round_size=round_size, seed=0)
+    ops = measure(lambda: tactic_optimizer.optimize_tactics(home, away, round_size=round_size, seed=0),
+                  ops_per_call=int(payoffs.played.sum()) * round_size)
+    record("tactic_optimizer[36 pairings]", ops, "matches")
+
+
+def scripted_payoffs(means, swings=None):
+    """
+    A simulate function for optimize_tactics that needs no engine: every match of pairing (home, away) in round r
+    pays means[home][away] plus a noise term common to all pairings in the round, plus swings[home] * (-1) ** r.
+    """
+    np = pytest.importorskip("numpy")
+    swings = swings or {}
+
+    def simulate(home_team, away_team, home_tactic, away_tactic, n, seed_sequence):
+        round_number = seed_sequence.spawn_key[-1]
+        common = np.random.default_rng(seed_sequence).normal()
+        return np.full(n, means[home_tactic][away_tactic] + common + swings.get(home_tactic, 0) * (-1) ** round_number)
+    return simulate
+
+
+def test_tactic_optimizer_prunes_dominated_tactics(teams):
+    tactic_optimizer = pytest.importorskip("tactic_optimizer")
+    means = {"attack": {"press": 1, "sit": 1, "gamble": 3},
+             "normal": {"press": 1, "sit": 1, "gamble": 3},
+             "defend": {"press": -1, "sit": -1, "gamble": 2}}  # Worse than attack against everything
+    payoffs = tactic_optimizer.optimize_tactics(*teams, list(means), ["press", "sit", "gamble"], round_size=10,
+                                                max_rounds=8, seed=0,
+                                                simulate=scripted_payoffs(means, {"normal": 0.5}))
+    # Common random numbers cancel the round noise, so a constant gap is significant at the first test
+    assert payoffs.pruned_home == {"defend": tactic_optimizer.MIN_ROUNDS}
+    assert payoffs.pruned_away == {"gamble": tactic_optimizer.MIN_ROUNDS}
+    assert payoffs.played.max() == 8 and payoffs.best_response() in ("attack", "normal")
+    assert payoffs.away_best_response("attack") in ("press", "sit")
+    assert not payoffs.significant("normal", "attack", "press")
+
+
+def test_tactic_optimizer_corrects_for_many_comparisons(teams):
+    tactic_optimizer = pytest.importorskip("tactic_optimizer")
+    means = {tactic: {"normal": 0} for tactic in ("a", "b", "c")}
+    # b beats a by 1 on average, by 1 +- swing in alternate rounds: a paired z of 2.2 over ten rounds
+    swing = 10 ** 0.5 / 2.2 / (10 / 9) ** 0.5
+    payoffs = tactic_optimizer.optimize_tactics(*teams, ["a", "b", "c"], ["normal"], round_size=10, max_rounds=10,
+                                                min_rounds=10, seed=0,
+                                                simulate=scripted_payoffs({**means, "b": {"normal": 1}},
+                                                                          {"b": swing}))
+    difference, p_value = payoffs.significance("b", "a")
+    assert difference == pytest.approx(1) and p_value == pytest.approx(0.0278, abs=1e-3)
+    # Significant on its own at alpha = 0.05, but not after correcting for the six home comparisons
+    assert payoffs.significant("b", "a")
+    assert payoffs.pruned_home == {} and payoffs.pruned_away == {}
+
+
+def test_player_stats_aggregation(teams):
+    player_stats = pytest.importorskip("player_stats")
+    home, away = teams
+    n = 200
+    record("player_stats_aggregation",
+           measure(lambda: player_stats.aggregate_player_stats(home, away, n, workers=1, seed=0), ops_per_call=n),
+           "matches")
+
+
+def test_stats_are_credited_and_merged():
+    np = pytest.importorskip("numpy")
+    player_stats = pytest.importorskip("player_stats")
+    home, away = make_team("Credit"), make_team("Debit")
+    players = home.players + away.players
+    rng = random.Random(1)
+    counts = []
+    aggregator = player_stats.StatsAggregator(players)
+    for _ in range(10):
+        match = Match(home, away, record_events=False, rng=rng)
+        match.simulate_match()
+        previous = aggregator.totals.copy()
+        aggregator.observe()
+        counts.append(aggregator.totals - previous)
+        summed = dict(zip(player_stats.STAT_FIELDS, counts[-1].sum(axis=0)))
+        # Every minute is one play: a pass kept or a turnover, and a goal or a shot off target
+        assert summed["goals"] == summed["shots_on"] == match.home_goals + match.away_goals
+        assert summed["passes"] + summed["turnovers"] == summed["shots_on"] + summed["shots_off"] == \
+            Match.MATCH_TIME
+
+    # Aggregates over parts of the matches merge into the aggregate over all of them
+    whole = player_stats.StatsAggregator(players)
+    whole.add(np.stack(counts))
+    first, second = player_stats.StatsAggregator(players), player_stats.StatsAggregator(players)
+    for match_counts in counts[:4]:
+        first.add(match_counts)
+    second.add(np.stack(counts[4:]))
+    merged = first.merge(second)
+    assert merged.matches == whole.matches == aggregator.matches == 10
+    assert (merged.totals == whole.totals).all() and (aggregator.totals == whole.totals).all()
+    assert np.allclose(merged.mean, whole.mean) and np.allclose(merged.variance, whole.variance)
+    assert np.allclose(aggregator.variance, whole.variance)
+
+
+def test_roster_loading(tmp_path):
+    roster_loader = pytest.importorskip("roster_loader")
+    path = str(tmp_path / "league.db")
+    roster_loader.write_roster_database(path, {f"Team{index}": make_team(f"T{index}P", 20) for index in range(50)})
+
+    def load():
+        with roster_loader.RosterLoader(roster_loader.SqliteRosterSource(path)) as loader:
+            return [loader.team(name) for name in loader.team_names()]
+
+    record("roster_loading[50x20]", measure(load, ops_per_call=50 * 20), "players")
+
+
+def test_roster_refresh_after_lazy_load(tmp_path):
+    import sqlite3
+    roster_loader = pytest.importorskip("roster_loader")
+    path = str(tmp_path / "league.db")
+    roster_loader.write_roster_database(path, {"A": make_team("A", 2), "B": make_team("B", 2)})
+    with roster_loader.RosterLoader(roster_loader.SqliteRosterSource(path)) as loader:
+        team_a = loader.team("A")
+        with sqlite3.connect(path) as connection:
+            connection.execute("UPDATE players SET powerInAttack = 99, updated = 5 WHERE name = 'A0'")
+            connection.execute("UPDATE players SET powerInAttack = 98, updated = 9 WHERE name = 'B0'")
+        connection.close()
+        team_b = loader.team("B")
+        assert team_b.players[0].powerInOffense == 98
+        # Loading B must not move the watermark past A0's pending change
+        assert loader.refresh() == 1
+        assert team_a.players[0].powerInOffense == 99
+        assert loader.refresh() == 0
+
+
+def test_roster_load_racing_refresh(tmp_path):
+    import sqlite3
+    roster_loader = pytest.importorskip("roster_loader")
+    path = str(tmp_path / "league.db")
+    roster_loader.write_roster_database(path, {"A": make_team("A", 2), "B": make_team("B", 2)})
+
+    class RacingSource(roster_loader.SqliteRosterSource):
+        def read(self, teams, since=None):
+            records = super().read(teams, since)
+            if teams == ["B"] and not edited:
+                # B0 changes and a refresh runs after B was read but before it is stored
+                edited.append(True)
+                with sqlite3.connect(path) as connection:
+                    connection.execute("UPDATE players SET powerInAttack = 97, updated = 7 WHERE name = 'B0'")
+                connection.close()
+                loader.refresh()
+            return records
+
+    edited = []
+    with roster_loader.RosterLoader(RacingSource(path)) as loader:
+        loader.team("A")
+        assert loader.team("B").players[0].powerInOffense == 97
+        assert loader.version == 7 and loader.refresh() == 0
+
+
+def test_csv_roster_refresh(tmp_path):
+    import csv
+    roster_loader = pytest.importorskip("roster_loader")
+    from roster_store import SOURCE_COLUMNS
+    path = tmp_path / "league.csv"
+    header = ["team", "name", *SOURCE_COLUMNS, "updated"]
+    rows = [{"team": team, "name": f"{team}{index}", **{source: 50 for source in SOURCE_COLUMNS}, "updated": 0}
+            for team in "AB" for index in range(2)]
+
+    def write():
+        with open(path, "w", newline="") as roster_file:
+            writer = csv.DictWriter(roster_file, header)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    write()
+    with roster_loader.RosterLoader(roster_loader.CsvRosterSource(str(path))) as loader:
+        assert loader.team_names() == ["A", "B"]
+        team = loader.team("A")
+        assert [player.name for player in team.players] == ["A0", "A1"]
+        rows[1].update(powerInAttack=70, updated=1)
+        rows[2].update(team="A", updated=2)  # B0 moves to A
+        write()
+        assert loader.refresh() == 2
+        assert [player.name for player in team.players] == ["A0", "A1", "B0"]
+        assert team.players[1].powerInOffense == 70
+        assert loader.refresh() == 0
+
+
+def test_stream_without_matches(teams):
+    from monte_carlo import stream_many
+    assert list(stream_many(*teams, max_matches=0)) == []
+    estimates = [result.n for result in stream_many(*teams, precision=0, max_matches=5, seed=0, chunk_size=2)]
+    assert estimates == [2, 4, 5]
+
+
+def test_empty_result_has_no_estimates(teams):
+    from monte_carlo import simulate_many
+    result = simulate_many(*teams, 0, workers=1)
+    assert result.n == 0
+    assert all(math.isnan(probability) for probability in result.probabilities().values())
+    assert all(math.isnan(goals) for goals in result.expected_goals())
+    assert all(interval == (0.0, 1.0) for interval in result.confidence_intervals().values())
+
+
+def test_result_cache_key_leaves_teams_alone(teams, tmp_path):
+    result_cache = pytest.importorskip("result_cache")
+    home, away = teams
+    home.reset_active_players()
+    home.remove_from_play(home.players[3])
+    active = list(home.get_active_players())
+    key = result_cache.query_key(home, away, 100, seed=0)
+    assert home.get_active_players() == active
+    home.reset_active_players()
+    assert result_cache.query_key(home, away, 100, seed=0) == key
+    with result_cache.ResultCache() as cache:
+        cache.simulate_many(home, away, 100, workers=1)
+        cache.simulate_many(home, away, 100, workers=1)
+        assert cache.misses == 0 and not cache.memory
+
+
+def test_commentary_is_reused(teams):
+    match = Match(*teams, rng=random.Random(0))
+    commentary = match.commentary
+    assert len(commentary) == 0
+    match.simulate_match()
+    assert match.commentary is commentary
+    assert len(commentary) == len(match.events) + 1 and commentary[-1] == match.outcome
+    assert commentary.lines is commentary.lines
+
+
+def test_physics_engine_on_one_world():
+    players, ball = make_pitch(22)
+    engine = physics.PhysicsEngine(players, ball)
+    assert all(player.world is engine.world for player in players) and ball.world is engine.world
+    shuffled_players, shuffled_ball = make_pitch(22)
+    shuffled = physics.PhysicsEngine(shuffled_players[::-1], shuffled_ball)
+    engine.run(200)
+    shuffled.run(200)
+    assert [(player.x, player.y) for player in players] == [(player.x, player.y) for player in shuffled_players]
+    assert (ball.x, ball.y) == (shuffled_ball.x, shuffled_ball.y)
+
+
+def test_kickoff_keeps_moving():
+    engine = physics.kickoff()
+    positions = []
+    for _ in range(6):
+        engine.run(50)
+        positions.append([(player.x, player.y) for player in engine.players] + [(engine.ball.x, engine.ball.y)])
+    # Every body moves between every pair of checkpoints: a challenger within reach keeps contesting the ball
+    for before, after in zip(positions, positions[1:]):
+        assert all(first != second for first, second in zip(before, after))
+
+
+def test_physics_tournament_is_symmetric(monkeypatch):
+    np = pytest.importorskip("numpy")
+    tournament = pytest.importorskip("tournament")
+    monkeypatch.setattr(Match, "HOME_ADVANTAGE", 1.0)
+    team = make_team("Mirror")
+    _, home_profile, _, away_profile = tournament.fixture_profiles(Match(team, team, record_events=False))
+    scores = [tournament.simulate_profiles([(home_profile, away_profile)] * 16, 1200,
+                                           np.random.SeedSequence(seed))[:2]
+              for seed in (0, 1)]
+    assert not all((a == b).all() for a, b in zip(*scores))
+    home, away = (sum(int(goals.sum()) for goals in side) for side in zip(*scores))
+    assert home + away > 0
+    assert 0.3 < home / (home + away) < 0.7
+
+
+def test_pickled_team_carries_only_its_rows():
+    import pickle
+    from roster_store import RosterStore
+    store = RosterStore()
+    for index in range(1_000):
+        Player(MockDataSource(f"Throwaway{index}"), store)
+    team = Team([Player(MockDataSource(f"Pickled{index}"), store) for index in range(3)])
+    team.players[2].stats.goals = 4
+    copy = pickle.loads(pickle.dumps(team))
+    assert len(copy.players[0].store) == 3
+    assert [player.name for player in copy.players] == [player.name for player in team.players]
+    assert copy.players[2].stats.goals == 4
+    assert copy.players[1].powerInOffense == team.players[1].powerInOffense
+
+
+def test_store_reuses_rows_of_dropped_players():
+    from roster_store import RosterStore, SOURCE_COLUMNS
+    store = RosterStore.default()
+    for index in range(1_000):
+        Player(MockDataSource(f"Temporary{index}"))
+    rows = len(store)
+    for index in range(1_000):
+        Player(MockDataSource(f"Temporary{index}"))
+    assert len(store) == rows
+
+    store = RosterStore()
+    dropped = Player(MockDataSource("Dropped"), store)
+    dropped.injured = True
+    dropped.stats.goals = 3
+    kept = Player(MockDataSource("Kept"), store)
+    row, stats = dropped.row, dropped.stats
+    del dropped
+    assert store.free == []  # Its StatsPlayer still views the row
+    del stats
+    reused = Player(MockDataSource("Reused"), store)
+    assert reused.row == row and not reused.injured and reused.stats.goals == 0 and reused.name == "Reused"
+    del reused
+    assert store.add_many(["Bulk0", "Bulk1"], {source: [0, 0] for source in SOURCE_COLUMNS}).tolist() == [row, 2]
+    assert len(store) == 3 and kept.name == "Kept"
+
+
+def test_record_stats_is_honoured(teams):
+    tournament = pytest.importorskip("tournament")
+    league = pytest.importorskip("league")
+    home, away = teams
+    players = home.players + away.players
+    before = [player.stats.as_dict() for player in players]
+    for workers in (1, 2):
+        league.League([home, away]).simulate_season(workers=workers, seed=0)
+    list(tournament.simulate_physics_matches([Match(home, away, record_events=False, record_stats=False)],
+                                             workers=1, seed=0, duration=5))
+    assert [player.stats.as_dict() for player in players] == before
+    match = Match(home, away, record_events=False, rng=random.Random(0))
+    match.simulate_match()
+    stats = [player.stats.as_dict() for player in players]
+    assert sum(entry["goals"] for entry in stats) - sum(entry["goals"] for entry in before) == \
+        match.home_goals + match.away_goals
@@ -0,0 +1,212 @@
+import numpy as np
+
+from classes import Match, Tactics
+from monte_carlo import run_chunks
+from physics import WIDTH, HEIGHT, GOAL_WIDTH, GOAL_HEIGHT, FRAME_TIME
+from physics_world import POSSESSION_COOLDOWN, PhysicsWorld
+
+CHUNK_SIZE = 4  # Fixtures simulated together in one world per task
+MAX_PLAYERS = 11  # Per side; further active players stay on the bench
+
+# 2D attributes of a player rated 100, scaled down by the player's rating
+BASE_SPEED = 5
+BASE_SPRINT_SPEED = 7
+BASE_KICK_RANGE = 150
+MAX_DISPERSION = 45  # Degrees of spread for a player with zero accuracy
+
+# Kick-off positions of the home side as fractions of the pitch, goalkeeper first; the away side is mirrored
+FORMATION = ((0.15, 0.5), (0.2, 0.15), (0.2, 0.38), (0.2, 0.62), (0.2, 0.85), (0.33, 0.15), (0.33, 0.38),
+             (0.33, 0.62), (0.33, 0.85), (0.45, 0.35), (0.45, 0.65))
+
+# Columns of a side's profile array
+SPEED, SPRINT_SPEED, KICK_RANGE, KICK_DISPERSION, FATIGUE = range(5)
+
+GOAL_TOP = HEIGHT // 2 - GOAL_HEIGHT // 2
+KICKOFF_GAP = 10  # How far behind the centre spot, in their own half, the kicker stands
+
+
+def side_profile(team, ratings, tactic):
+    """
+    Maps a side's effective ratings to 2D attributes for its first MAX_PLAYERS active players.
+    Midfield drives speed (with the tactic's speed effect, which the rating tables do not carry), offense
+    the kick range, accuracy the shot dispersion and energy the starting fatigue.
+    Returns the players and a (players, 5) array of SPEED, SPRINT_SPEED, KICK_RANGE, KICK_DISPERSION, FATIGUE.
+    """
+    players = team.get_active_players()[:MAX_PLAYERS]
+    speed_multiplier = Tactics.TACTIC_EFFECTS.get(tactic, {}).get("speed", 1.0)
+    profile = np.zeros((len(players), 5))
+    for slot, player in enumerate(players):
+        index = team.roster_position(player)
+        pace = ratings.rating(index, "powerInMidfield") / 100 * speed_multiplier
+        profile[slot, SPEED] = BASE_SPEED * pace
+        profile[slot, SPRINT_SPEED] = BASE_SPRINT_SPEED * pace
+        profile[slot, KICK_RANGE] = BASE_KICK_RANGE * ratings.rating(index, "powerInOffense") / 100
+        profile[slot, KICK_DISPERSION] = MAX_DISPERSION * max(0.0, 1 - ratings.rating(index, "powerInAccuracy") / 100)
+        profile[slot, FATIGUE] = min(100.0, max(0.0, player.energy))
+    return players, profile
+
+
+def _kickoff_positions():
+    """
+    Returns (x, y) arrays of length 2 * MAX_PLAYERS: home slots first, then the mirrored away slots.
+    """
+    x = np.array([fx for fx, _ in FORMATION] + [1 - fx for fx, _ in FORMATION]) * WIDTH
+    y = np.array([fy for _, fy in FORMATION] * 2) * HEIGHT
+    return x, y
+
+
+def _restart(world, pitches, kickoff_x, kickoff_y, active, kicking_side):
+    """
+    Puts the players of the given pitches back in formation and the ball on the centre spot, at the feet of
+    the most advanced active player of kicking_side (one bool per pitch, True for the away side).
+    """
+    players, balls = world.players, world.balls
+    for name, value in (("x", kickoff_x), ("y", kickoff_y), ("previous_x", kickoff_x), ("previous_y", kickoff_y)):
+        players[name][pitches] = np.where(active[pitches], value, players[name][pitches])
+    players["sprinting"][pitches] = False
+    players["in_possession"][pitches] = False
+    balls["x"][pitches] = WIDTH / 2
+    balls["y"][pitches] = HEIGHT / 2
+    balls["dx"][pitches] = 0
+    balls["dy"][pitches] = 0
+    balls["holder"][pitches] = -1
+    balls["possession_cooldown"][pitches] = 0
+
+    # Formation slots run from the goalkeeper forwards, so the kicker is the side's last active slot
+    away_slot = np.arange(2 * MAX_PLAYERS) >= MAX_PLAYERS
+    eligible = active[pitches] & (away_slot == np.asarray(kicking_side)[:, None])
+    has_kicker = eligible.any(axis=1)
+    pitches = np.asarray(pitches)[has_kicker]
+    kicker = 2 * MAX_PLAYERS - 1 - np.argmax(eligible[has_kicker, ::-1], axis=1)
+    players["x"][pitches, kicker] = WIDTH / 2 + np.where(away_slot[kicker], KICKOFF_GAP, -KICKOFF_GAP)
+    players["y"][pitches, kicker] = HEIGHT / 2
+    players["previous_x"][pitches, kicker] = players["x"][pitches, kicker]
+    players["previous_y"][pitches, kicker] = HEIGHT / 2
+    players["in_possession"][pitches, kicker] = True
+    balls["holder"][pitches] = kicker
+    balls["possession_cooldown"][pitches] = POSSESSION_COOLDOWN
+
+
+def fixture_profiles(match):
+    """
+    Runs match's setup phase and returns (home players, home profile, away players, away profile), the sides
+    as side_profile maps them for simulate_profiles.
+    """
+    match.setup_phase()
+    home_players, home_profile = side_profile(match.home_team, match.home_ratings, match.home_tactic)
+    away_players, away_profile = side_profile(match.away_team, match.away_ratings, match.away_tactic)
+    return home_players, home_profile, away_players, away_profile
+
+
+def simulate_profiles(profiles, frames, seed_sequence):
+    """
+    Plays a list of (home profile, away profile) fixtures side by side in one PhysicsWorld for the given number
+    of frames, drawing from a generator seeded with seed_sequence.
+    Returns (home goals, away goals, per-slot counters) arrays; counters[match, slot] is goals, shots on, shots off.
+    """
+    rng = np.random.default_rng(seed_sequence)
+    matches, slots = len(profiles), 2 * MAX_PLAYERS
+    world = PhysicsWorld(matches, slots)
+    players, balls = world.players, world.balls
+    kickoff_x, kickoff_y = _kickoff_positions()
+    side = np.arange(slots) >= MAX_PLAYERS  # False for home slots, True for away slots
+
+    # Empty slots are parked far off the pitch, apart from each other, and never move
+    active = np.zeros((matches, slots), dtype=bool)
+    players["x"][:] = -10_000 - 100 * np.arange(slots)
+    for match, (home, away) in enumerate(profiles):
+        for offset, profile in ((0, home), (MAX_PLAYERS, away)):
+            columns = slice(offset, offset + len(profile))
+            active[match, columns] = True
+            players["speed"][match, columns] = profile[:, SPEED]
+            players["sprint_speed"][match, columns] = profile[:, SPRINT_SPEED]
+            players["kick_range"][match, columns] = profile[:, KICK_RANGE]
+            players["kick_dispersion"][match, columns] = profile[:, KICK_DISPERSION]
+            players["fatigue"][match, columns] = profile[:, FATIGUE]
+    # Home players attack the goal on the right, away players the one on the left
+    players["goal_x"][:] = np.where(side, GOAL_WIDTH // 2, WIDTH - GOAL_WIDTH // 2)
+    players["goal_y"][:] = HEIGHT // 2
+    balls["friction"][:] = 0.92
+    everyone = np.arange(matches)
+    _restart(world, everyone, kickoff_x, kickoff_y, active, rng.random(matches) < 0.5)
+
+    goals = np.zeros((2, matches), dtype=np.int32)
+    counters = np.zeros((matches, slots, 3), dtype=np.int32)
+    last_touch = np.full(matches, -1, dtype=np.intp)
+    for _ in range(frames):
+        shooters = world.step(rng=rng)
+        shot = np.flatnonzero(shooters >= 0)
+        if len(shot):
+            shooter = shooters[shot]
+            away_shooter = side[shooter]
+            # On target when the ball's path crosses the front of the goal between the posts
+            mouth = np.where(away_shooter, GOAL_WIDTH, WIDTH - GOAL_WIDTH)
+            dx, dy = balls["dx"][shot], balls["dy"][shot]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                travel = (mouth - balls["x"][shot]) / dx
+            crossing = balls["y"][shot] + travel * dy
+            on_target = (travel >= 0) & (crossing >= GOAL_TOP) & (crossing <= GOAL_TOP + GOAL_HEIGHT)
+            counters[shot, shooter, 1] += on_target
+            counters[shot, shooter, 2] += ~on_target
+            last_touch[shot] = shooter
+        held = balls["holder"] >= 0
+        last_touch[held] = balls["holder"][held]
+
+        ball_x, ball_y = balls["x"], balls["y"]
+        between_posts = (ball_y >= GOAL_TOP) & (ball_y <= GOAL_TOP + GOAL_HEIGHT)
+        scored_away = between_posts & (ball_x <= GOAL_WIDTH)  # In the home goal
+        scored_home = between_posts & (ball_x >= WIDTH - GOAL_WIDTH)
+        out = (ball_x < 0) | (ball_x > WIDTH) | (ball_y < 0) | (ball_y > HEIGHT)
+        if scored_home.any() or scored_away.any() or out.any():
+            goals[0] += scored_home
+            goals[1] += scored_away
+            for scored, scoring_side in ((scored_home, False), (scored_away, True)):
+                # Own goals count for the score but not for anyone's tally
+                credited = np.flatnonzero(scored & (last_touch >= 0))
+                credited = credited[side[last_touch[credited]] == scoring_side]
+                counters[credited, last_touch[credited], 0] += 1
+            # The side that conceded kicks off; after the ball went out, the side that did not touch it last,
+            # or either side when nobody had touched it since the previous restart
+            kicking_side = np.where(last_touch >= 0, ~side[last_touch], rng.random(matches) < 0.5)
+            kicking_side = np.where(scored_home, True, np.where(scored_away, False, kicking_side))
+            restart = np.flatnonzero(scored_home | scored_away | out)
+            _restart(world, restart, kickoff_x, kickoff_y, active, kicking_side[restart])
+            last_touch[restart] = -1
+    return goals[0], goals[1], counters
+
+
+def simulate_physics_matches(matches, workers=None, seed=None, duration=None, chunk_size=CHUNK_SIZE):
+    """
+    Plays classes.Match fixtures on the 2D physics engine, headless and across a process pool, and yields each
+    match as its chunk finishes, with home_goals, away_goals and outcome filled in. Unless the match was created
+    with record_stats=False, each player's goals, shots_on and shots_off are added to their StatsPlayer counters
+    in this process before the match is yielded, whichever worker played it.
+    duration is in simulated seconds and defaults to Match.MATCH_TIME minutes. Chunks of chunk_size fixtures are
+    seeded by monte_carlo.run_chunks, so a given seed gives the same results whatever the number of workers.
+    """
+    frames = int(round((duration or Match.MATCH_TIME * 60) / FRAME_TIME))
+    matches = list(matches)
+    rosters, profiles = [], []
+    for match in matches:
+        home_players, home_profile, away_players, away_profile = fixture_profiles(match)
+        rosters.append(home_players + [None] * (MAX_PLAYERS - len(home_players)) + away_players)
+        profiles.append((home_profile, away_profile))
+    chunks = [range(start, min(start + chunk_size, len(matches))) for start in range(0, len(matches), chunk_size)]
+
+    def finish(chunk, result):
+        home_goals, away_goals, counters = result
+        for offset, index in enumerate(chunk):
+            match = matches[index]
+            match.home_goals, match.away_goals = int(home_goals[offset]), int(away_goals[offset])
+            match.outcome = match.outcome_phase()
+            if match.record_stats:
+                for player, (goals, shots_on, shots_off) in zip(rosters[index], counters[offset].tolist()):
+                    if player is not None:
+                        player.stats.goals += goals
+                        player.stats.shots_on += shots_on
+                        player.stats.shots_off += shots_off
+            yield match
+
+    tasks = [([profiles[i] for i in chunk], frames) for chunk in chunks]
+    for index, result in run_chunks(simulate_profiles, tasks, workers, seed, in_order=False):
+        yield from finish(chunks[index], result)
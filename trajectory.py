@@ -0,0 +1,233 @@
+import numpy as np
+
+from physics import FRAME_TIME, Goal, PlayerStats
+
+MAGIC = b"FBTRAJ"
+VERSION = 1
+INITIAL_CAPACITY = 1024  # Frames preallocated before the file first has to grow
+
+# Events noted per frame as bit flags
+EVENT_POSSESSION_CHANGE = 1
+EVENT_COLLISION = 2
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S6"),
+    ("version", "<u2"),
+    ("players", "<u4"),
+    ("capacity", "<u8"),
+    ("frames", "<u8"),  # Frames written so far; updated with every frame, so a crashed run stays readable
+    ("frame_time", "<f8"),
+])
+ROSTER_DTYPE = np.dtype([
+    ("name", "S32"),
+    ("color", "u1", 3),
+    ("kick_range", "<f4"),
+    ("kick_dispersion", "<f4"),
+])
+GOAL_DTYPE = np.dtype([("x", "<f4"), ("y", "<f4"), ("width", "<f4"), ("height", "<f4")])
+
+
+def frame_dtype(n_players):
+    """
+    One fixed-size record per frame, so frame i lives at a known offset and seeking is a single index.
+    """
+    return np.dtype([
+        ("x", "<f4", n_players),
+        ("y", "<f4", n_players),
+        ("rotation", "<f4", n_players),
+        ("fatigue", "<f4", n_players),
+        ("in_possession", "?", n_players),
+        ("ball_x", "<f4"),
+        ("ball_y", "<f4"),
+        ("possessed_by", "<i2"),  # Player slot holding the ball, or -1
+        ("events", "u1"),
+    ])
+
+
+def _layout(n_players):
+    """
+    Returns the byte offsets of the roster, goals and frame blocks: header, roster, two goals, then frames.
+    """
+    roster = HEADER_DTYPE.itemsize
+    goals = roster + ROSTER_DTYPE.itemsize * n_players
+    frames = goals + GOAL_DTYPE.itemsize * 2
+    return roster, goals, frames
+
+
+class TrajectoryRecorder:
+    def __init__(self, path, engine, capacity=INITIAL_CAPACITY):
+        """
+        Engine observer that appends every step's player and ball state to a preallocated, memory-mapped
+        binary file. A frame is a handful of array stores; when the file is full it is grown by doubling.
+        """
+        self.path = path
+        self.players = list(engine.players)
+        self.slots = {id(player): slot for slot, player in enumerate(self.players)}
+        self.dtype = frame_dtype(len(self.players))
+        _, goals_offset, self.frames_offset = _layout(len(self.players))
+
+        header = np.memmap(path, dtype=HEADER_DTYPE, mode="w+", shape=1)
+        header["magic"] = MAGIC
+        header["version"] = VERSION
+        header["players"] = len(self.players)
+        header["frame_time"] = FRAME_TIME
+        roster = np.memmap(path, dtype=ROSTER_DTYPE, mode="r+", offset=HEADER_DTYPE.itemsize,
+                           shape=len(self.players))
+        for slot, player in enumerate(self.players):
+            roster[slot] = (str(player).encode()[:32], player.color, player.stats.kick_range,
+                            player.stats.kick_dispersion)
+        goals = np.memmap(path, dtype=GOAL_DTYPE, mode="r+", offset=goals_offset, shape=2)
+        for index, goal in enumerate((engine.home_goal, engine.away_goal)):
+            if goal is not None:
+                goals[index] = (goal.x, goal.y, goal.width, goal.height)
+        roster.flush()
+        goals.flush()
+
+        self.header = header
+        self.count = 0
+        self.previous_holder = -1
+        self._map(capacity)
+
+    def _map(self, capacity):
+        # Mapping past the end of the file extends it, so growing is just a bigger mapping
+        self.frames = np.memmap(self.path, dtype=self.dtype, mode="r+", offset=self.frames_offset, shape=capacity)
+        self.header["capacity"] = capacity
+
+    def __call__(self, engine):
+        if self.count == len(self.frames):
+            self.frames.flush()
+            self._map(2 * len(self.frames))
+        players = self.players
+        record = self.frames[self.count]
+        record["x"] = [p.x for p in players]
+        record["y"] = [p.y for p in players]
+        record["rotation"] = [p.rotation for p in players]
+        record["fatigue"] = [p.fatigue for p in players]
+        record["in_possession"] = [p.in_possession for p in players]
+        ball = engine.ball
+        record["ball_x"] = ball.x
+        record["ball_y"] = ball.y
+        holder = -1 if ball.possessed_by is None else self.slots.get(id(ball.possessed_by), -1)
+        record["possessed_by"] = holder
+        events = 0
+        if holder != self.previous_holder:
+            events |= EVENT_POSSESSION_CHANGE
+        if any(p.in_collision for p in players):
+            events |= EVENT_COLLISION
+        record["events"] = events
+        self.previous_holder = holder
+        self.count += 1
+        self.header["frames"] = self.count
+
+    def close(self):
+        self.frames.flush()
+        self.header.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def record_trajectory(engine, path, frames, capacity=None):
+    """
+    Runs the engine headless for the given number of frames while recording them to path.
+    """
+    with TrajectoryRecorder(path, engine, capacity or frames) as recorder:
+        engine.add_observer(recorder)
+        try:
+            engine.run(frames)
+        finally:
+            engine.remove_observer(recorder)
+    return recorder.count
+
+
+class ReplayPlayer:
+    def __init__(self, name, color, stats):
+        self.name = name
+        self.color = color
+        self.stats = stats
+        self.x = self.y = self.rotation = self.fatigue = 0.0
+        self.in_possession = False
+
+    def __str__(self):
+        return self.name
+
+
+class ReplayBall:
+    def __init__(self):
+        self.x = self.y = 0.0
+        self.possessed_by = None
+
+
+class Replay:
+    def __init__(self, path):
+        """
+        Read-only view of a recorded trajectory. The frames stay memory-mapped: seek() reads one record,
+        and the columns (replay.frames["x"], ...) can be handed to analytics without loading the file.
+        seek() fills in engine-shaped players, ball and goals, so renderers built for PhysicsEngine
+        draw a replay as well.
+        """
+        header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)[0]
+        if header["magic"] != MAGIC or header["version"] != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} trajectory file")
+        n_players = int(header["players"])
+        roster_offset, goals_offset, frames_offset = _layout(n_players)
+        self.frame_time = float(header["frame_time"])
+        self.roster = np.memmap(path, dtype=ROSTER_DTYPE, mode="r", offset=roster_offset, shape=n_players)
+        goals = np.memmap(path, dtype=GOAL_DTYPE, mode="r", offset=goals_offset, shape=2)
+        count = int(header["frames"])
+        if count:
+            self.frames = np.memmap(path, dtype=frame_dtype(n_players), mode="r", offset=frames_offset, shape=count)
+        else:
+            self.frames = np.zeros(0, dtype=frame_dtype(n_players))
+
+        self.players = [ReplayPlayer(entry["name"].decode(), tuple(int(c) for c in entry["color"]),
+                                     PlayerStats(float(entry["kick_range"]), float(entry["kick_dispersion"])))
+                        for entry in self.roster]
+        self.ball = ReplayBall()
+        self.home_goal, self.away_goal = [Goal(*(float(goal[field]) for field in GOAL_DTYPE.names))
+                                          for goal in goals]
+        self.frame = 0
+        self.running = True
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __getitem__(self, index):
+        return self.frames[index]
+
+    @property
+    def time(self):
+        return self.frame * self.frame_time
+
+    def seek(self, frame):
+        """
+        Moves the players and ball to the given frame and returns self.
+        """
+        record = self.frames[frame]
+        columns = zip(self.players, record["x"].tolist(), record["y"].tolist(), record["rotation"].tolist(),
+                      record["fatigue"].tolist(), record["in_possession"].tolist())
+        for player, x, y, rotation, fatigue, in_possession in columns:
+            player.x, player.y, player.rotation, player.fatigue = x, y, rotation, fatigue
+            player.in_possession = in_possession
+        self.ball.x = float(record["ball_x"])
+        self.ball.y = float(record["ball_y"])
+        holder = int(record["possessed_by"])
+        self.ball.possessed_by = self.players[holder] if holder >= 0 else None
+        self.frame = frame + 1  # Same numbering as PhysicsEngine.frame after that step
+        return self
+
+    def stop(self):
+        self.running = False
+
+    def play(self, observer, start=0, stop=None):
+        """
+        Feeds frames start..stop to an engine observer such as PygameRenderer, until it calls stop().
+        """
+        self.running = True
+        for frame in range(start, len(self) if stop is None else stop):
+            if not self.running:
+                break
+            observer(self.seek(frame))
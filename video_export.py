@@ -0,0 +1,102 @@
+import queue
+import threading
+
+import numpy as np
+import pygame
+
+from match_visualization import PygameRenderer
+from physics import WIDTH, HEIGHT, FRAME_TIME
+
+QUEUE_SIZE = 64  # Rendered frames allowed to wait for the encoder before the simulation blocks
+
+
+class VideoExporter:
+    def __init__(self, path, size=(WIDTH, HEIGHT), resolution=None, frame_skip=1, fps=None, codec="mp4v",
+                 queue_size=QUEUE_SIZE, show_shooting_range=True):
+        """
+        Engine observer that renders every frame_skip-th step to an offscreen surface and hands the pixels
+        through a bounded queue to a background thread, which scales them to resolution and encodes them with
+        cv2.VideoWriter. No window is opened and nothing sleeps, so export runs as fast as the simulation.
+        fps defaults to real time: one video frame per frame_skip steps of FRAME_TIME seconds.
+        """
+        import cv2  # Loaded on first export rather than with the module; a missing install fails here, not mid-run
+        self.cv2 = cv2
+        self.path = path
+        self.size = size
+        self.resolution = resolution or size
+        self.frame_skip = frame_skip
+        self.fps = fps or 1 / (FRAME_TIME * frame_skip)
+        self.codec = codec
+        self.surface = pygame.Surface(size)
+        self.renderer = PygameRenderer(self.surface, show_shooting_range, frame_delay=0)
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.steps = 0
+        self.written = 0
+        self.error = None
+        self.thread = threading.Thread(target=self._encode, name="video-export", daemon=True)
+        self.thread.start()
+
+    def __call__(self, engine):
+        self.steps += 1
+        if (self.steps - 1) % self.frame_skip:
+            return
+        self.renderer.draw(engine)
+        self.frames.put(pygame.image.tobytes(self.surface, "RGB"))
+
+    def _encode(self):
+        cv2 = self.cv2
+        writer = None
+        width, height = self.size
+        while True:
+            frame = self.frames.get()
+            if frame is None:
+                break
+            if self.error is not None:
+                continue  # Keep draining so the simulation never blocks on a dead encoder
+            try:
+                if writer is None:
+                    writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*self.codec), self.fps,
+                                             self.resolution)
+                    if not writer.isOpened():
+                        raise IOError(f"Cannot open {self.path} for writing with codec {self.codec}")
+                image = cv2.cvtColor(np.frombuffer(frame, dtype=np.uint8).reshape(height, width, 3),
+                                     cv2.COLOR_RGB2BGR)
+                if self.resolution != self.size:
+                    image = cv2.resize(image, self.resolution, interpolation=cv2.INTER_AREA)
+                writer.write(image)
+                self.written += 1
+            except Exception as error:
+                self.error = error
+        if writer is not None:
+            writer.release()
+
+    def close(self):
+        """
+        Waits for the encoder to write every queued frame and finish the file.
+        Re-raises anything that went wrong in the encoder thread.
+        """
+        if self.thread.is_alive():
+            self.frames.put(None)
+            self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def export_video(engine, path, frames, **options):
+    """
+    Runs the engine headless for the given number of frames while exporting them to a video file.
+    Options are passed on to VideoExporter. Returns the number of video frames written.
+    """
+    with VideoExporter(path, **options) as exporter:
+        engine.add_observer(exporter)
+        try:
+            engine.run(frames)
+        finally:
+            engine.remove_observer(exporter)
+    return exporter.written